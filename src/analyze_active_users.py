@@ -7,19 +7,20 @@ import re
 import polars as pl
 from datetime import datetime
 
+try:
+    from .common_io import find_log_files
+except ImportError:
+    from common_io import find_log_files
+
 # Regex pattern for extracting timestamp and user
 TIMESTAMP_USER_PATTERN = re.compile(r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+).*\[User:\s*(?P<user>[A-Z0-9]+)\]')
 
-def find_log_files(input_dir: Path) -> list[Path]:
-    """Find all .log files in the input directory structure."""
-    return [p for p in input_dir.rglob("*.log") if p.is_file()]
-
 def extract_activity_from_file(log_file: Path) -> list[dict]:
     """Extract user activity data from a single log file."""
     activities = []
     
     try:
-        with log_file.open("r", encoding="utf-8", errors="ignore") as f:
+        with log_file.open("r", encoding="utf-8", errors="ignore", buffering=1 << 16) as f:
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
                 if not line:
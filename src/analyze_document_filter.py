@@ -10,12 +10,37 @@ Usage:
 """
 
 import argparse
+import functools
 import re
+import sys
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import polars as pl
 from typing import List, Dict, Any, Tuple
 
+try:
+    from .common_io import comparison_operator, empty_event_columns, read_lines_containing
+except ImportError:
+    from common_io import comparison_operator, empty_event_columns, read_lines_containing
+
+# Literal marker of document filter log lines
+DOCUMENT_FILTER_LITERAL = b"Document filter executed with criteria: Entries:"
+
+# Pattern to match document filter log lines
+DOCUMENT_FILTER_PATTERN = re.compile(
+    r'(\d{4}-\d{2}-\d{2}) (\d{2}):\d{2}:\d{2}\.\d+ .+ \[User: ([^\]]+)\] .+ Document filter executed with criteria: Entries: (.+)$'
+)
+
+# Pattern to match field definitions like {namespace}field='value'
+CRITERIA_PATTERN = re.compile(r'\{[^}]+\}([^=]+)=\'([^\']*)\'')
+
+# Columns of the extracted document filter events, one event per filter criterion
+DOCUMENT_FILTER_COLUMNS = (
+    "date", "hour", "user_id", "field_name",
+    "filter_value", "filter_type", "filter_pattern", "file_path"
+)
+
 
 def extract_criteria_patterns(criteria_text: str) -> List[Tuple[str, str]]:
     """
@@ -27,12 +52,10 @@ def extract_criteria_patterns(criteria_text: str) -> List[Tuple[str, str]]:
     Returns:
         List of (field_name, filter_value) tuples
     """
-    # Pattern to match field definitions like {namespace}field='value'
-    pattern = r'\{[^}]+\}([^=]+)=\'([^\']*)\''
-    matches = re.findall(pattern, criteria_text)
-    return matches
+    return CRITERIA_PATTERN.findall(criteria_text)
 
 
+@functools.lru_cache(maxsize=4096)
 def classify_filter_type(filter_value: str) -> str:
     """
     Classify the type of filter based on the filter value.
@@ -47,16 +70,9 @@ def classify_filter_type(filter_value: str) -> str:
         return "empty"
     
     # Check for comparison operators
-    if filter_value.startswith('>='):
-        return ">=[value]"
-    elif filter_value.startswith('<='):
-        return "<=[value]"
-    elif filter_value.startswith('>'):
-        return ">[value]"
-    elif filter_value.startswith('<'):
-        return "<[value]"
-    elif filter_value.startswith('='):
-        return "=[value]"
+    operator = comparison_operator(filter_value)
+    if operator is not None:
+        return f"{operator}[value]"
     
     # Check for multiple words
     words = filter_value.split()
@@ -66,6 +82,7 @@ def classify_filter_type(filter_value: str) -> str:
         return "single_word"
 
 
+@functools.lru_cache(maxsize=4096)
 def get_filter_pattern(filter_value: str) -> str:
     """
     Get the pattern of the filter value for grouping similar filters.
@@ -80,16 +97,9 @@ def get_filter_pattern(filter_value: str) -> str:
         return "empty"
     
     # Check for comparison operators first
-    if filter_value.startswith('>='):
-        return ">="
-    elif filter_value.startswith('<='):
-        return "<="
-    elif filter_value.startswith('>'):
-        return ">"
-    elif filter_value.startswith('<'):
-        return "<"
-    elif filter_value.startswith('='):
-        return "="
+    operator = comparison_operator(filter_value)
+    if operator is not None:
+        return operator
     
     # For non-comparison filters, return word count pattern
     words = filter_value.split()
@@ -105,52 +115,68 @@ def get_filter_pattern(filter_value: str) -> str:
         return f"{len(words)}_words"
 
 
-def extract_document_filter_events_from_file(file_path: Path) -> List[Dict[str, Any]]:
+def extract_document_filter_events_columnar(file_path: Path) -> Dict[str, Any]:
     """
-    Extract document filter events from a single log file.
+    Extract document filter events from a single log file as columns.
     Only processes lines with "Document filter executed with criteria: Entries:"
     
+    pl.DataFrame(extract_document_filter_events_columnar(file_path)) builds the
+    event frame without a dict per event.
+    
     Args:
         file_path: Path to the log file
         
     Returns:
-        List of document filter event dictionaries
+        Dictionary of document filter event columns, keyed by DOCUMENT_FILTER_COLUMNS
     """
-    events = []
-    
-    # Pattern to match document filter log lines
-    pattern = r'(\d{4}-\d{2}-\d{2}) (\d{2}):\d{2}:\d{2}\.\d+ .+ \[User: ([^\]]+)\] .+ Document filter executed with criteria: Entries: (.+)$'
+    columns = empty_event_columns(DOCUMENT_FILTER_COLUMNS)
+    path_str = str(file_path)
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                line = line.strip()
-                if 'Document filter executed with criteria: Entries:' in line:
-                    match = re.search(pattern, line)
-                    if match:
-                        date_str, hour_str, user_id, criteria = match.groups()
-                        
-                        # Extract field-value pairs from criteria
-                        field_value_pairs = extract_criteria_patterns(criteria)
-                        
-                        for field_name, filter_value in field_value_pairs:
-                            filter_type = classify_filter_type(filter_value)
-                            filter_pattern = get_filter_pattern(filter_value)
-                            
-                            events.append({
-                                'date': date_str,
-                                'hour': int(hour_str),
-                                'user_id': user_id,
-                                'field_name': field_name,
-                                'filter_value': filter_value,
-                                'filter_type': filter_type,
-                                'filter_pattern': filter_pattern,
-                                'file_path': str(file_path)
-                            })
+        # Only the lines containing the event literal are read and decoded
+        for line in read_lines_containing(file_path, DOCUMENT_FILTER_LITERAL):
+            match = DOCUMENT_FILTER_PATTERN.search(line)
+            if match:
+                date_str, hour_str, user_id = match.group(1, 2, 3)
+                # Dates, field names and classifications repeat, so events share
+                # one string per value
+                date_str = sys.intern(date_str)
+                
+                # Extract field-value pairs from the criteria span of the line in place
+                field_value_pairs = CRITERIA_PATTERN.findall(line, *match.span(4))
+                
+                for field_name, filter_value in field_value_pairs:
+                    field_name = sys.intern(field_name)
+                    filter_type = sys.intern(classify_filter_type(filter_value))
+                    filter_pattern = sys.intern(get_filter_pattern(filter_value))
+                    
+                    columns['date'].append(date_str)
+                    columns['hour'].append(int(hour_str))
+                    columns['user_id'].append(user_id)
+                    columns['field_name'].append(field_name)
+                    columns['filter_value'].append(filter_value)
+                    columns['filter_type'].append(filter_type)
+                    columns['filter_pattern'].append(filter_pattern)
+                    columns['file_path'].append(path_str)
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
     
-    return events
+    return columns
+
+
+def extract_document_filter_events_from_file(file_path: Path) -> List[Dict[str, Any]]:
+    """
+    Extract document filter events from a single log file.
+    Only processes lines with "Document filter executed with criteria: Entries:"
+    
+    Args:
+        file_path: Path to the log file
+        
+    Returns:
+        List of document filter event dictionaries
+    """
+    columns = extract_document_filter_events_columnar(file_path)
+    return [dict(zip(DOCUMENT_FILTER_COLUMNS, row)) for row in zip(*columns.values())]
 
 
 def generate_field_summary(df: pl.DataFrame) -> pl.DataFrame:
@@ -289,23 +315,25 @@ def main():
     
     print(f"Found {len(log_files)} log files to analyze for document filter usage")
     
-    # Extract all document filter events
-    all_events = []
-    for i, log_file in enumerate(log_files, 1):
-        if i % 100 == 0:
-            print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
-        
-        events = extract_document_filter_events_from_file(log_file)
-        all_events.extend(events)
+    # Extract all document filter events as columns, scanning files in parallel; map keeps the file order
+    columns = empty_event_columns(DOCUMENT_FILTER_COLUMNS)
+    with ProcessPoolExecutor() as executor:
+        for i, (log_file, file_columns) in enumerate(
+            zip(log_files, executor.map(extract_document_filter_events_columnar, log_files, chunksize=16)), 1
+        ):
+            if i % 100 == 0:
+                print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
+            for name, values in file_columns.items():
+                columns[name].extend(values)
     
-    print(f"Extracted {len(all_events)} document filter events")
+    print(f"Extracted {len(columns['date'])} document filter events")
     
-    if not all_events:
+    if not columns['date']:
         print("No document filter events found. Exiting.")
         return
     
     # Create DataFrame
-    df = pl.DataFrame(all_events)
+    df = pl.DataFrame(columns)
     
     # Load user agents data for total user count
     user_agents_df = None
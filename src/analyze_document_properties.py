@@ -6,9 +6,12 @@ import polars as pl
 import datetime
 from collections import defaultdict
 
+# Pattern for the user tag of a log line
+USER_PATTERN = re.compile(r'\[User: ([^\]]+)\]')
+
 def extract_user_from_log(line):
     """Extract user from a log line."""
-    user_match = re.search(r'\[User: ([^\]]+)\]', line)
+    user_match = USER_PATTERN.search(line)
     if user_match:
         return user_match.group(1)
     return "Unknown"
@@ -71,7 +74,7 @@ def analyze_document_properties(logs_dir, output_dir, verbose=False):
         if verbose and i % 100 == 0:
             print(f"Processing file {i+1}/{total_files}: {os.path.basename(log_file)}")
             
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
+        with open(log_file, 'r', encoding='utf-8', errors='ignore', buffering=1 << 16) as f:
             for line in f:
                 # Check for document attributes changed
                 properties_match = properties_change_pattern.search(line)
@@ -2,10 +2,23 @@
 # Usage: python src/analyze_employee_filter.py --input logs/splits --output out
 from __future__ import annotations
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import functools
 import re
+import sys
 import polars as pl
-from datetime import datetime
+
+try:
+    from .common_io import (
+        comparison_operator, empty_event_columns, find_log_files, get_total_unique_users,
+        parse_date_and_hour, read_lines_containing
+    )
+except ImportError:
+    from common_io import (
+        comparison_operator, empty_event_columns, find_log_files, get_total_unique_users,
+        parse_date_and_hour, read_lines_containing
+    )
 
 # Regex pattern for extracting employee filter information
 EMPLOYEE_FILTER_PATTERN = re.compile(
@@ -15,27 +28,25 @@ EMPLOYEE_FILTER_PATTERN = re.compile(
     r'(?P<criteria>.+)$'
 )
 
+# Literal marker of employee filter lines
+EMPLOYEE_FILTER_LITERAL = b"Employee filter executed with criteria: Entries:"
+
 # Pattern to extract individual filter criteria
 CRITERIA_PATTERN = re.compile(
     r'\{[^}]*\}(?P<field_name>[^=]+)=\'(?P<filter_value>[^\']*)\''
 )
 
+# Filter values repeat across events, so classifications are cached per value
+@functools.lru_cache(maxsize=4096)
 def classify_filter_type(filter_value: str) -> str:
     """Classify the type of filter based on the filter value."""
     if not filter_value:
         return 'empty'
     
     # Compare patterns: extract the operator pattern
-    if re.match(r'^>=', filter_value):
-        return '>=[value]'
-    elif re.match(r'^<=', filter_value):
-        return '<=[value]'
-    elif re.match(r'^>', filter_value):
-        return '>[value]'
-    elif re.match(r'^<', filter_value):
-        return '<[value]'
-    elif re.match(r'^=', filter_value):
-        return '=[value]'
+    operator = comparison_operator(filter_value)
+    if operator is not None:
+        return f'{operator}[value]'
     
     # Combined: contains spaces (multiple words)
     if ' ' in filter_value:
@@ -44,22 +55,16 @@ def classify_filter_type(filter_value: str) -> str:
     # Basic: simple string without spaces or comparison operators
     return 'single_word'
 
+@functools.lru_cache(maxsize=4096)
 def get_filter_pattern(filter_value: str) -> str:
     """Get the filter pattern without the actual value."""
     if not filter_value:
         return 'empty'
     
     # Extract comparison operators
-    if re.match(r'^>=', filter_value):
-        return '>='
-    elif re.match(r'^<=', filter_value):
-        return '<='
-    elif re.match(r'^>', filter_value):
-        return '>'
-    elif re.match(r'^<', filter_value):
-        return '<'
-    elif re.match(r'^=', filter_value):
-        return '='
+    operator = comparison_operator(filter_value)
+    if operator is not None:
+        return operator
     
     # Count words for non-comparison filters
     word_count = len(filter_value.split())
@@ -68,74 +73,71 @@ def get_filter_pattern(filter_value: str) -> str:
     else:
         return 'single_word'
 
-def find_log_files(input_dir: Path) -> list[Path]:
-    """Find all .log files in the input directory structure."""
-    return [p for p in input_dir.rglob("*.log") if p.is_file()]
+# Columns of the extracted employee filter events, one event per filter criterion
+FILTER_COLUMNS = (
+    "date", "hour", "timestamp", "user_id", "field_name",
+    "filter_value", "filter_type", "filter_pattern", "file_path"
+)
 
-def extract_employee_filter_events_from_file(log_file: Path) -> list[dict]:
-    """Extract employee filter events from a single log file."""
-    filter_events = []
+def append_employee_filter_events(columns: dict, line: str, file_path: str) -> None:
+    """Append the employee filter events of a single decoded log line, one per criterion, to the columns."""
+    match = EMPLOYEE_FILTER_PATTERN.match(line)
+    if match:
+        timestamp_str = match.group("timestamp")
+        user_id = match.group("user")
+        
+        # Parse timestamp for date extraction
+        try:
+            date, hour = parse_date_and_hour(timestamp_str)
+        except ValueError:
+            # Skip lines with invalid timestamps
+            return
+        
+        # Extract individual criteria, scanning the criteria span of the line in place
+        criteria_matches = CRITERIA_PATTERN.findall(line, *match.span("criteria"))
+        
+        for field_name, filter_value in criteria_matches:
+            # Clean up field name (remove namespace parts); field names and
+            # classifications repeat, so events share one string per value
+            clean_field_name = sys.intern(field_name.strip())
+            
+            # Classify filter type and get pattern
+            filter_type = sys.intern(classify_filter_type(filter_value))
+            filter_pattern = sys.intern(get_filter_pattern(filter_value))
+            
+            columns["date"].append(date)
+            columns["hour"].append(hour)
+            columns["timestamp"].append(timestamp_str)
+            columns["user_id"].append(user_id)
+            columns["field_name"].append(clean_field_name)
+            columns["filter_value"].append(filter_value)
+            columns["filter_type"].append(filter_type)
+            columns["filter_pattern"].append(filter_pattern)
+            columns["file_path"].append(file_path)
+
+def extract_employee_filter_events_columnar(log_file: Path) -> dict:
+    """Extract employee filter events from a single log file as columns.
+
+    pl.DataFrame(extract_employee_filter_events_columnar(log_file)) builds the
+    event frame without a dict per event.
+    """
+    columns = empty_event_columns(FILTER_COLUMNS)
+    file_path = str(log_file)
     
     try:
-        with log_file.open("r", encoding="utf-8", errors="ignore") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or "Employee filter executed with criteria: Entries:" not in line:
-                    continue
-                
-                match = EMPLOYEE_FILTER_PATTERN.match(line)
-                if match:
-                    timestamp_str = match.group("timestamp")
-                    user_id = match.group("user")
-                    criteria = match.group("criteria")
+        # Only the lines containing the event literal are read and decoded
+        for line in read_lines_containing(log_file, EMPLOYEE_FILTER_LITERAL):
+            append_employee_filter_events(columns, line, file_path)
                     
-                    # Parse timestamp for date extraction
-                    try:
-                        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
-                        date = dt.date().isoformat()
-                        hour = dt.hour
-                        
-                        # Extract individual criteria
-                        criteria_matches = CRITERIA_PATTERN.findall(criteria)
-                        
-                        for field_name, filter_value in criteria_matches:
-                            # Clean up field name (remove namespace parts)
-                            clean_field_name = field_name.strip()
-                            
-                            # Classify filter type and get pattern
-                            filter_type = classify_filter_type(filter_value)
-                            filter_pattern = get_filter_pattern(filter_value)
-                            
-                            filter_events.append({
-                                "date": date,
-                                "hour": hour,
-                                "timestamp": timestamp_str,
-                                "user_id": user_id,
-                                "field_name": clean_field_name,
-                                "filter_value": filter_value,
-                                "filter_type": filter_type,
-                                "filter_pattern": filter_pattern,
-                                "file_path": str(log_file)
-                            })
-                    except ValueError:
-                        # Skip lines with invalid timestamps
-                        continue
-                        
     except Exception as e:
         print(f"Error processing file {log_file}: {e}")
     
-    return filter_events
+    return columns
 
-def get_total_unique_users(output_dir: Path) -> int:
-    """Get total number of unique users from user agents data."""
-    user_agents_path = output_dir / "user_agents.csv"
-    if user_agents_path.exists():
-        try:
-            df = pl.read_csv(user_agents_path)
-            return df["user_id"].n_unique()
-        except Exception:
-            return 0
-    return 0
+def extract_employee_filter_events_from_file(log_file: Path) -> list[dict]:
+    """Extract employee filter events from a single log file."""
+    columns = extract_employee_filter_events_columnar(log_file)
+    return [dict(zip(FILTER_COLUMNS, row)) for row in zip(*columns.values())]
 
 def analyze_employee_filter(input_dir: Path, output_dir: Path) -> None:
     """Analyze employee filter usage patterns and generate reports."""
@@ -144,22 +146,30 @@ def analyze_employee_filter(input_dir: Path, output_dir: Path) -> None:
     log_files = find_log_files(input_dir)
     print(f"Found {len(log_files)} log files to analyze for employee filter usage")
     
-    # Extract all filter events
-    all_filter_events = []
-    for i, log_file in enumerate(log_files, 1):
-        if i % 100 == 0:
-            print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
-        filter_events = extract_employee_filter_events_from_file(log_file)
-        all_filter_events.extend(filter_events)
-    
-    if not all_filter_events:
+    # Extract all filter events as columns, scanning files in parallel; map keeps the file order
+    columns = empty_event_columns(FILTER_COLUMNS)
+    with ProcessPoolExecutor() as executor:
+        for i, (log_file, file_columns) in enumerate(
+            zip(log_files, executor.map(extract_employee_filter_events_columnar, log_files, chunksize=16)), 1
+        ):
+            if i % 100 == 0:
+                print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
+            for name, values in file_columns.items():
+                columns[name].extend(values)
+    
+    if not columns["date"]:
         print("No employee filter events found")
         create_empty_filter_reports(output_dir)
         return
     
     # Create DataFrame
-    df = pl.DataFrame(all_filter_events)
-    print(f"Extracted {len(all_filter_events)} employee filter events")
+    df = pl.DataFrame(columns)
+    print(f"Extracted {df.height} employee filter events")
+    
+    generate_filter_reports(df, output_dir)
+
+def generate_filter_reports(df: pl.DataFrame, output_dir: Path) -> None:
+    """Generate all employee filter reports from a DataFrame of filter events."""
     
     # Get total unique users for percentage calculations
     total_users = get_total_unique_users(output_dir)
@@ -180,7 +190,7 @@ def analyze_employee_filter(input_dir: Path, output_dir: Path) -> None:
 def generate_field_usage_summary(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate summary of which fields are filtered most often."""
     field_stats = (
-        df.group_by("field_name")
+        df.lazy().group_by("field_name")
         .agg([
             pl.len().alias("total_filters"),
             pl.n_unique("user_id").alias("unique_users"),
@@ -189,12 +199,12 @@ def generate_field_usage_summary(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("total_filters", descending=True)
     )
     
-    field_stats.write_csv(output_dir / "employee_filter_fields.csv")
+    field_stats.sink_csv(output_dir / "employee_filter_fields.csv")
 
 def generate_filter_type_summary(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate summary of filter types used."""
     type_stats = (
-        df.group_by("filter_type")
+        df.lazy().group_by("filter_type")
         .agg([
             pl.len().alias("total_usage"),
             pl.n_unique("user_id").alias("unique_users"),
@@ -203,12 +213,12 @@ def generate_filter_type_summary(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("total_usage", descending=True)
     )
     
-    type_stats.write_csv(output_dir / "employee_filter_types.csv")
+    type_stats.sink_csv(output_dir / "employee_filter_types.csv")
 
 def generate_filter_pattern_summary(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate summary of filter patterns used (without values)."""
     pattern_stats = (
-        df.group_by("filter_pattern")
+        df.lazy().group_by("filter_pattern")
         .agg([
             pl.len().alias("total_usage"),
             pl.n_unique("user_id").alias("unique_users"),
@@ -217,12 +227,12 @@ def generate_filter_pattern_summary(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("total_usage", descending=True)
     )
     
-    pattern_stats.write_csv(output_dir / "employee_filter_patterns.csv")
+    pattern_stats.sink_csv(output_dir / "employee_filter_patterns.csv")
 
 def generate_daily_filter_usage(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate daily filter usage statistics."""
     daily_stats = (
-        df.group_by("date")
+        df.lazy().group_by("date")
         .agg([
             pl.len().alias("total_filters"),
             pl.n_unique("user_id").alias("users_using_filters"),
@@ -231,12 +241,12 @@ def generate_daily_filter_usage(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("date")
     )
     
-    daily_stats.write_csv(output_dir / "daily_employee_filter_usage.csv")
+    daily_stats.sink_csv(output_dir / "daily_employee_filter_usage.csv")
 
 def generate_hourly_filter_usage(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate hourly filter usage patterns."""
     hourly_stats = (
-        df.group_by("hour")
+        df.lazy().group_by("hour")
         .agg([
             pl.len().alias("total_filters"),
             pl.n_unique("user_id").alias("users_using_filters"),
@@ -245,14 +255,14 @@ def generate_hourly_filter_usage(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("hour")
     )
     
-    hourly_stats.write_csv(output_dir / "hourly_employee_filter_usage.csv")
+    hourly_stats.sink_csv(output_dir / "hourly_employee_filter_usage.csv")
 
 def generate_user_filter_patterns(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate per-user filter usage behavior analysis."""
     
     # Get most used field per user
     user_field_counts = (
-        df.group_by(["user_id", "field_name"])
+        df.lazy().group_by(["user_id", "field_name"])
         .agg(pl.len().alias("count"))
         .sort("count", descending=True)
     )
@@ -264,7 +274,7 @@ def generate_user_filter_patterns(df: pl.DataFrame, output_dir: Path) -> None:
     )
     
     user_stats = (
-        df.group_by("user_id")
+        df.lazy().group_by("user_id")
         .agg([
             pl.len().alias("total_filters"),
             pl.n_unique("field_name").alias("different_fields_used"),
@@ -274,7 +284,7 @@ def generate_user_filter_patterns(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("total_filters", descending=True)
     )
     
-    user_stats.write_csv(output_dir / "user_employee_filter_patterns.csv")
+    user_stats.sink_csv(output_dir / "user_employee_filter_patterns.csv")
 
 def generate_filter_usage_summary(df: pl.DataFrame, output_dir: Path, total_users: int, users_using_filters: int) -> None:
     """Generate summary statistics about employee filter usage."""
@@ -282,21 +292,9 @@ def generate_filter_usage_summary(df: pl.DataFrame, output_dir: Path, total_user
     # Calculate percentage of users using employee filters
     percentage_using_filters = (users_using_filters / total_users * 100) if total_users > 0 else 0
     
-    # Get most popular field
-    most_popular_field = (
-        df.group_by("field_name")
-        .agg(pl.len().alias("count"))
-        .sort("count", descending=True)["field_name"]
-        .first()
-    )
-    
-    # Get most common filter type
-    most_common_type = (
-        df.group_by("filter_type")
-        .agg(pl.len().alias("count"))
-        .sort("count", descending=True)["filter_type"]
-        .first()
-    )
+    # Get most popular field and most common filter type
+    most_popular_field = df["field_name"].value_counts(sort=True).item(0, 0)
+    most_common_type = df["filter_type"].value_counts(sort=True).item(0, 0)
     
     # Calculate average filters per user
     avg_filters_per_user = (df.height / users_using_filters) if users_using_filters > 0 else 0
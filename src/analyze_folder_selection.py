@@ -2,10 +2,21 @@
 # Usage: python src/analyze_folder_selection.py --input logs/splits --output out
 from __future__ import annotations
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 import re
 import polars as pl
-from datetime import datetime
+
+try:
+    from .common_io import (
+        empty_event_columns, find_log_files, get_total_unique_users, parse_date_and_hour,
+        read_lines_containing
+    )
+except ImportError:
+    from common_io import (
+        empty_event_columns, find_log_files, get_total_unique_users, parse_date_and_hour,
+        read_lines_containing
+    )
 
 # Regex pattern for extracting folder selection information
 FOLDER_PATTERN = re.compile(
@@ -14,60 +25,57 @@ FOLDER_PATTERN = re.compile(
     r'FolderSelected:\s*(?P<folder_name>.+?)$'
 )
 
-def find_log_files(input_dir: Path) -> list[Path]:
-    """Find all .log files in the input directory structure."""
-    return [p for p in input_dir.rglob("*.log") if p.is_file()]
+# Literal marker of folder selection lines
+FOLDER_LITERAL = b"FolderSelected:"
 
-def extract_folder_events_from_file(log_file: Path) -> list[dict]:
-    """Extract folder selection events from a single log file."""
-    folder_events = []
+# Columns of the extracted folder selection events
+FOLDER_COLUMNS = ("date", "hour", "timestamp", "user_id", "folder_name", "file_path")
+
+def append_folder_event(columns: dict, line: str, file_path: str) -> None:
+    """Append the folder selection event of a single decoded log line, if any, to the columns."""
+    match = FOLDER_PATTERN.match(line)
+    if match:
+        timestamp_str = match.group("timestamp")
+        user_id = match.group("user")
+        folder_name = match.group("folder_name").strip()
+        
+        # Parse timestamp for date extraction
+        try:
+            date, hour = parse_date_and_hour(timestamp_str)
+        except ValueError:
+            # Skip lines with invalid timestamps
+            return
+        
+        columns["date"].append(date)
+        columns["hour"].append(hour)
+        columns["timestamp"].append(timestamp_str)
+        columns["user_id"].append(user_id)
+        columns["folder_name"].append(folder_name)
+        columns["file_path"].append(file_path)
+
+def extract_folder_events_columnar(log_file: Path) -> dict:
+    """Extract folder selection events from a single log file as columns.
+
+    pl.DataFrame(extract_folder_events_columnar(log_file)) builds the event frame
+    without a dict per event.
+    """
+    columns = empty_event_columns(FOLDER_COLUMNS)
+    file_path = str(log_file)
     
     try:
-        with log_file.open("r", encoding="utf-8", errors="ignore") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or "FolderSelected:" not in line:
-                    continue
-                
-                match = FOLDER_PATTERN.match(line)
-                if match:
-                    timestamp_str = match.group("timestamp")
-                    user_id = match.group("user")
-                    folder_name = match.group("folder_name").strip()
+        # Only the lines containing the event literal are read and decoded
+        for line in read_lines_containing(log_file, FOLDER_LITERAL):
+            append_folder_event(columns, line, file_path)
                     
-                    # Parse timestamp for date extraction
-                    try:
-                        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
-                        date = dt.date().isoformat()
-                        hour = dt.hour
-                        
-                        folder_events.append({
-                            "date": date,
-                            "hour": hour,
-                            "timestamp": timestamp_str,
-                            "user_id": user_id,
-                            "folder_name": folder_name,
-                            "file_path": str(log_file)
-                        })
-                    except ValueError:
-                        # Skip lines with invalid timestamps
-                        continue
-                        
     except Exception as e:
         print(f"Error processing file {log_file}: {e}")
     
-    return folder_events
+    return columns
 
-def get_total_unique_users(output_dir: Path) -> int:
-    """Get total number of unique users from user agents data."""
-    user_agents_path = output_dir / "user_agents.csv"
-    if user_agents_path.exists():
-        try:
-            df = pl.read_csv(user_agents_path)
-            return df["user_id"].n_unique()
-        except Exception:
-            return 0
-    return 0
+def extract_folder_events_from_file(log_file: Path) -> list[dict]:
+    """Extract folder selection events from a single log file."""
+    columns = extract_folder_events_columnar(log_file)
+    return [dict(zip(FOLDER_COLUMNS, row)) for row in zip(*columns.values())]
 
 def analyze_folder_selection(input_dir: Path, output_dir: Path) -> None:
     """Analyze folder selection patterns and generate reports."""
@@ -76,22 +84,30 @@ def analyze_folder_selection(input_dir: Path, output_dir: Path) -> None:
     log_files = find_log_files(input_dir)
     print(f"Found {len(log_files)} log files to analyze for folder selection")
     
-    # Extract all folder events
-    all_folder_events = []
-    for i, log_file in enumerate(log_files, 1):
-        if i % 100 == 0:
-            print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
-        folder_events = extract_folder_events_from_file(log_file)
-        all_folder_events.extend(folder_events)
+    # Extract all folder events as columns, scanning files in parallel; map keeps the file order
+    columns = empty_event_columns(FOLDER_COLUMNS)
+    with ProcessPoolExecutor() as executor:
+        for i, (log_file, file_columns) in enumerate(
+            zip(log_files, executor.map(extract_folder_events_columnar, log_files, chunksize=16)), 1
+        ):
+            if i % 100 == 0:
+                print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
+            for name, values in file_columns.items():
+                columns[name].extend(values)
     
-    if not all_folder_events:
+    if not columns["date"]:
         print("No folder selection events found")
         create_empty_folder_reports(output_dir)
         return
     
     # Create DataFrame
-    df = pl.DataFrame(all_folder_events)
-    print(f"Extracted {len(all_folder_events)} folder selection events")
+    df = pl.DataFrame(columns)
+    print(f"Extracted {df.height} folder selection events")
+    
+    generate_folder_reports(df, output_dir)
+
+def generate_folder_reports(df: pl.DataFrame, output_dir: Path) -> None:
+    """Generate all folder selection reports from a DataFrame of folder events."""
     
     # Get total unique users for percentage calculations
     total_users = get_total_unique_users(output_dir)
@@ -110,7 +126,7 @@ def analyze_folder_selection(input_dir: Path, output_dir: Path) -> None:
 def generate_folder_popularity_summary(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate summary of which folders are selected most often."""
     folder_stats = (
-        df.group_by("folder_name")
+        df.lazy().group_by("folder_name")
         .agg([
             pl.count("folder_name").alias("total_selections"),
             pl.n_unique("user_id").alias("unique_users"),
@@ -119,12 +135,12 @@ def generate_folder_popularity_summary(df: pl.DataFrame, output_dir: Path) -> No
         .sort("total_selections", descending=True)
     )
     
-    folder_stats.write_csv(output_dir / "folder_popularity_summary.csv")
+    folder_stats.sink_csv(output_dir / "folder_popularity_summary.csv")
 
 def generate_daily_folder_usage(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate daily folder usage statistics."""
     daily_stats = (
-        df.group_by("date")
+        df.lazy().group_by("date")
         .agg([
             pl.count("folder_name").alias("total_folder_selections"),
             pl.n_unique("user_id").alias("users_selecting_folders"),
@@ -133,12 +149,12 @@ def generate_daily_folder_usage(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("date")
     )
     
-    daily_stats.write_csv(output_dir / "daily_folder_usage.csv")
+    daily_stats.sink_csv(output_dir / "daily_folder_usage.csv")
 
 def generate_hourly_folder_usage(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate hourly folder usage patterns."""
     hourly_stats = (
-        df.group_by("hour")
+        df.lazy().group_by("hour")
         .agg([
             pl.count("folder_name").alias("total_folder_selections"),
             pl.n_unique("user_id").alias("avg_users_selecting"),
@@ -147,14 +163,14 @@ def generate_hourly_folder_usage(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("hour")
     )
     
-    hourly_stats.write_csv(output_dir / "hourly_folder_usage.csv")
+    hourly_stats.sink_csv(output_dir / "hourly_folder_usage.csv")
 
 def generate_user_folder_patterns(df: pl.DataFrame, output_dir: Path) -> None:
     """Generate per-user folder selection behavior analysis."""
     
     # First get the most used folder per user
     user_folder_counts = (
-        df.group_by(["user_id", "folder_name"])
+        df.lazy().group_by(["user_id", "folder_name"])
         .agg(pl.count("folder_name").alias("count"))
         .sort("count", descending=True)
     )
@@ -167,7 +183,7 @@ def generate_user_folder_patterns(df: pl.DataFrame, output_dir: Path) -> None:
     )
     
     user_stats = (
-        df.group_by("user_id")
+        df.lazy().group_by("user_id")
         .agg([
             pl.count("folder_name").alias("total_folder_selections"),
             pl.n_unique("folder_name").alias("different_folders_used"),
@@ -177,7 +193,7 @@ def generate_user_folder_patterns(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("total_folder_selections", descending=True)
     )
     
-    user_stats.write_csv(output_dir / "user_folder_patterns.csv")
+    user_stats.sink_csv(output_dir / "user_folder_patterns.csv")
 
 def generate_folder_usage_summary(df: pl.DataFrame, output_dir: Path, total_users: int, users_using_folders: int) -> None:
     """Generate summary statistics about folder selection usage."""
@@ -186,12 +202,7 @@ def generate_folder_usage_summary(df: pl.DataFrame, output_dir: Path, total_user
     percentage_using_folders = (users_using_folders / total_users * 100) if total_users > 0 else 0
     
     # Get most popular folder
-    most_popular_folder = (
-        df.group_by("folder_name")
-        .agg(pl.len().alias("count"))
-        .sort("count", descending=True)["folder_name"]
-        .first()
-    )
+    most_popular_folder = df["folder_name"].value_counts(sort=True).item(0, 0)
     
     # Calculate average selections per user
     avg_selections_per_user = (df.height / users_using_folders) if users_using_folders > 0 else 0
@@ -4,15 +4,308 @@ import os
 from pathlib import Path
 import polars as pl
 import datetime
-from collections import defaultdict
+import mmap
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_user_from_log(line):
-    """Extract user from a log line."""
-    user_match = re.search(r'\[User: ([^\]]+)\]', line)
+try:
+    from .common_io import find_log_files
+except ImportError:
+    from common_io import find_log_files
+
+# Pattern for extracting the user from a log line
+USER_PATTERN = re.compile(rb'\[User: ([^\]]+)\]')
+
+# Single alternation for all misc events; the outer named group that matched is
+# available as match.lastgroup. Character classes exclude \r and \n because the
+# pattern runs over whole files, so a match never spans two log lines.
+MASTER_PATTERN = re.compile(
+    rb'(?P<dossier>Open Employee Dossier called)'
+    rb'|(?P<assign>Assign (?P<assign_count>\d+) documents to employee)'
+    rb'|(?P<copy>Copy (?P<copy_count>\d+) documents to employee)'
+    rb'|(?P<view>View Page: Viewing document\. Mimetype:(?P<mimetype>[^\.\r\n]+)\.)'
+    rb'|(?P<download>Download: Downloaded document: (?P<size>\d+) bytes)'
+    rb'|(?P<excel>Excel export: ResultType=\'(?P<result_type>[^\'\r\n]+)\', ResultsView=\'(?P<result_view>[^\'\r\n]+)\', '
+    rb'FileName=\'(?P<file_name>[^\'\r\n]+)\', FileSize=(?P<file_size>[^\ \r\n]+))'
+    rb'|(?P<toggle>Element toggled: element:\'\{[^}\r\n]+\}(?P<element>[^\'\r\n]+)\')'
+    rb'|(?P<switch>View Page: Switched to other document\. Position:\d+)'
+)
+
+# Literal fragments of MASTER_PATTERN; files without any of them skip the regex
+MASTER_TOKENS = (
+    b"Open Employee Dossier",
+    b"Assign ",
+    b"Copy ",
+    b"View Page: ",
+    b"Download: Downloaded document",
+    b"Excel export: ",
+    b"Element toggled: ",
+)
+
+# Function names reported for the MASTER_PATTERN function groups
+FUNCTION_NAMES = {
+    "dossier": "Open Employee Dossier from a document",
+    "assign": "Assign document(s) to an employee",
+    "copy": "Copy document(s) to employee",
+    # Add more patterns here for other functions you want to track
+}
+
+# Files of at least this size are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 64 << 20
+
+# Fewer log files than this are scanned in-process, where starting workers would cost more
+MIN_FILES_FOR_POOL = 4
+
+def extract_user_from_log(buf, start=0, end=None):
+    """
+    Extract user from a log line (bytes), or from buf[start:end] of a file buffer.
+    
+    The range is searched in place, so no copy of the line is made. The user is
+    interned, so every event of the same user shares one string in the event
+    columns and unique-user sets, and it is pickled only once per file.
+    """
+    user_match = USER_PATTERN.search(buf, start, len(buf) if end is None else end)
     if user_match:
-        return user_match.group(1)
+        return sys.intern(user_match.group(1).decode('utf-8', errors='ignore'))
     return "Unknown"
 
+def _parse_file_size(file_size):
+    """
+    Parse an Excel export FileSize value (bytes) into a number of bytes.
+    
+    The value is usually a bare number such as b"91,55", which is converted
+    directly; anything else goes through the value and unit parsing below.
+    """
+    try:
+        return float(file_size.replace(b',', b'.'))
+    except ValueError:
+        pass
+    
+    file_size_str = file_size.decode('utf-8', errors='ignore')
+    try:
+        # Handle different file size formats (try both comma and dot as decimal separator)
+        file_size_value = float(file_size_str.replace(',', '.').split()[0])
+        file_size_unit = file_size_str.split()[-1]
+        
+        # Convert to bytes for consistency
+        if file_size_unit.lower() == 'kb':
+            return file_size_value * 1024
+        elif file_size_unit.lower() == 'mb':
+            return file_size_value * 1024 * 1024
+        else:
+            return file_size_value  # Assume bytes
+    except (ValueError, IndexError):
+        return 0  # Default if parsing fails
+
+def _new_aggregates():
+    """Create the empty accumulators for one log file, or for the merged totals."""
+    return {
+        # Function call events as columns, aggregated with Polars after the scan
+        "function_events": {"function_name": [], "user": [], "doc_count": []},
+        # Document viewing data per mimetype
+        "document_views": {},
+        # Document download data; sizes are packed as 8-byte ints rather than int objects
+        "document_downloads": {"total_downloads": 0, "unique_users": set(), "sizes": array("q")},
+        # Excel export data by result type
+        "excel_exports": {
+            "total_exports": 0,
+            "unique_users": set(),
+            "by_result_type": {}
+        },
+        # Resultgrid toggle data
+        "toggles": {
+            "total_toggles": 0,
+            "unique_users": set(),
+            "by_element": {}
+        },
+        # View page switch data
+        "view_switches": {"total_switches": 0, "unique_users": set()},
+    }
+
+def _iter_matches_with_line(pattern, buf):
+    """
+    Yield (match, line_start, line_end) for the matches of pattern in a whole file buffer.
+    
+    Line bounds are only looked up around an actual match, so lines without
+    any event never reach Python code. The search resumes right after the start
+    of each match rather than after its end, so event text inside another
+    event's match (e.g. an Excel export FileName) is still found, as it was
+    with one search() per pattern.
+    """
+    match = pattern.search(buf)
+    while match:
+        # Lines end at \n, \r\n or a lone \r, as in text mode
+        line_start = buf.rfind(b'\n', 0, match.start()) + 1
+        line_start = buf.rfind(b'\r', line_start, match.start()) + 1 or line_start
+        line_end = buf.find(b'\n', match.end())
+        if line_end == -1:
+            line_end = len(buf)
+        carriage_return = buf.find(b'\r', match.end(), line_end)
+        if carriage_return != -1:
+            line_end = carriage_return
+        yield match, line_start, line_end
+        match = pattern.search(buf, match.start() + 1)
+
+def _scan_buffer(buf, partial):
+    """Scan the contents of one log file and add its events to the partial aggregates."""
+    function_events = partial["function_events"]
+    document_view_data = partial["document_views"]
+    document_download_data = partial["document_downloads"]
+    excel_export_data = partial["excel_exports"]
+    toggle_data = partial["toggles"]
+    view_switch_data = partial["view_switches"]
+    
+    # Skip files that contain none of the literal fragments
+    if not any(buf.find(token) != -1 for token in MASTER_TOKENS):
+        return
+    
+    # Check all events in one regex pass over the whole file. Each event kind is
+    # counted at most once per log line, like one search() per pattern and line
+    user_line, user = -1, None
+    last_line_by_kind = {}
+    for match, line_start, line_end in _iter_matches_with_line(MASTER_PATTERN, buf):
+        kind = match.lastgroup
+        if last_line_by_kind.get(kind) == line_start:
+            continue
+        last_line_by_kind[kind] = line_start
+        if line_start != user_line:
+            user_line, user = line_start, extract_user_from_log(buf, line_start, line_end)
+        
+        if kind == "view":
+            # Update document view data
+            mimetype = match.group("mimetype").decode('utf-8', errors='ignore').strip()
+            view_entry = document_view_data.get(mimetype)
+            if view_entry is None:
+                view_entry = document_view_data[mimetype] = {"total_views": 0, "unique_users": set()}
+            view_entry["total_views"] += 1
+            view_entry["unique_users"].add(user)
+        
+        elif kind == "download":
+            # Update document download data
+            document_download_data["total_downloads"] += 1
+            document_download_data["unique_users"].add(user)
+            document_download_data["sizes"].append(int(match.group("size")))
+        
+        elif kind == "excel":
+            # Extract export details; ResultsView and FileName are not reported
+            result_type = match.group("result_type").decode('utf-8', errors='ignore')  # e.g., 'rs', 'es', etc.
+            file_size_bytes = _parse_file_size(match.group("file_size"))
+            
+            # Update overall Excel export data
+            excel_export_data["total_exports"] += 1
+            excel_export_data["unique_users"].add(user)
+            
+            # Update data for specific result type
+            type_entry = excel_export_data["by_result_type"].get(result_type)
+            if type_entry is None:
+                type_entry = excel_export_data["by_result_type"][result_type] = {
+                    "total_exports": 0, "unique_users": set(), "file_sizes": array("d")
+                }
+            type_entry["total_exports"] += 1
+            type_entry["unique_users"].add(user)
+            type_entry["file_sizes"].append(file_size_bytes)
+        
+        elif kind == "toggle":
+            # Extract element name (without namespace)
+            element_name = match.group("element").decode('utf-8', errors='ignore')
+            
+            # Update overall toggle data
+            toggle_data["total_toggles"] += 1
+            toggle_data["unique_users"].add(user)
+            
+            # Update data for specific element
+            element_entry = toggle_data["by_element"].get(element_name)
+            if element_entry is None:
+                element_entry = toggle_data["by_element"][element_name] = {"total_toggles": 0, "unique_users": set()}
+            element_entry["total_toggles"] += 1
+            element_entry["unique_users"].add(user)
+        
+        elif kind == "switch":
+            # Update view switch data
+            view_switch_data["total_switches"] += 1
+            view_switch_data["unique_users"].add(user)
+        
+        else:
+            # Record function event, with the document count for Assign and Copy
+            function_events["function_name"].append(FUNCTION_NAMES[kind])
+            function_events["user"].append(user)
+            function_events["doc_count"].append(
+                None if kind == "dossier" else int(match.group(f"{kind}_count"))
+            )
+
+def _process_one(log_file):
+    """Scan a single log file in a worker process and return its partial aggregates."""
+    partial = _new_aggregates()
+    
+    # Read small files with a single read() call and map large ones, without
+    # decoding either; empty files are skipped since they cannot be mapped
+    with open(log_file, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                _scan_buffer(buf, partial)
+        elif file_size:
+            _scan_buffer(f.read(), partial)
+    
+    return partial
+
+def _merge_aggregates(totals, partial):
+    """
+    Merge the partial aggregates of one log file into the running totals.
+    
+    Entries for keys not seen before are adopted as they are, since the
+    partial aggregates are not used after merging.
+    """
+    for column, values in partial["function_events"].items():
+        totals["function_events"][column].extend(values)
+    
+    for mimetype, data in partial["document_views"].items():
+        view_entry = totals["document_views"].setdefault(mimetype, data)
+        if view_entry is not data:
+            view_entry["total_views"] += data["total_views"]
+            view_entry["unique_users"].update(data["unique_users"])
+    
+    downloads = totals["document_downloads"]
+    downloads["total_downloads"] += partial["document_downloads"]["total_downloads"]
+    downloads["unique_users"].update(partial["document_downloads"]["unique_users"])
+    downloads["sizes"].extend(partial["document_downloads"]["sizes"])
+    
+    exports = totals["excel_exports"]
+    exports["total_exports"] += partial["excel_exports"]["total_exports"]
+    exports["unique_users"].update(partial["excel_exports"]["unique_users"])
+    for result_type, data in partial["excel_exports"]["by_result_type"].items():
+        type_entry = exports["by_result_type"].setdefault(result_type, data)
+        if type_entry is not data:
+            type_entry["total_exports"] += data["total_exports"]
+            type_entry["unique_users"].update(data["unique_users"])
+            type_entry["file_sizes"].extend(data["file_sizes"])
+    
+    toggles = totals["toggles"]
+    toggles["total_toggles"] += partial["toggles"]["total_toggles"]
+    toggles["unique_users"].update(partial["toggles"]["unique_users"])
+    for element_name, data in partial["toggles"]["by_element"].items():
+        element_entry = toggles["by_element"].setdefault(element_name, data)
+        if element_entry is not data:
+            element_entry["total_toggles"] += data["total_toggles"]
+            element_entry["unique_users"].update(data["unique_users"])
+    
+    totals["view_switches"]["total_switches"] += partial["view_switches"]["total_switches"]
+    totals["view_switches"]["unique_users"].update(partial["view_switches"]["unique_users"])
+
+def _scan_log_files(log_files):
+    """
+    Yield the partial aggregates of each log file, in file order.
+    
+    Executor.map keeps the file order, so list-valued data is merged deterministically.
+    """
+    if len(log_files) < MIN_FILES_FOR_POOL:
+        yield from map(_process_one, log_files)
+        return
+    
+    with ProcessPoolExecutor() as executor:
+        yield from executor.map(_process_one, log_files, chunksize=4)
+
 def analyze_misc_functions(logs_dir, output_dir, verbose=False):
     """
     Analyze logs for specific function calls and create summary statistics.
@@ -28,205 +321,46 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
     if verbose:
         print(f"Analyzing miscellaneous functions in logs...")
     
-    # Dictionary to store function call data
-    function_data = defaultdict(lambda: {"total_usage": 0, "unique_users": set(), "document_counts": []})
-    
-    # Dictionary to store document viewing data per mimetype
-    document_view_data = defaultdict(lambda: {"total_views": 0, "unique_users": set()})
-    
-    # Dictionary to store document download data
-    document_download_data = {
-        "total_downloads": 0,
-        "unique_users": set(),
-        "sizes": []
-    }
-    
-    # Dictionary to store Excel export data by result type
-    excel_export_data = {
-        "total_exports": 0,
-        "unique_users": set(),
-        "by_result_type": defaultdict(lambda: {"total_exports": 0, "unique_users": set(), "file_sizes": []})
-    }
-    
-    # Dictionary to store resultgrid toggle data
-    toggle_data = {
-        "total_toggles": 0,
-        "unique_users": set(),
-        "by_element": defaultdict(lambda: {"total_toggles": 0, "unique_users": set()})
-    }
-    
-    # Dictionary to store view page switch data
-    view_switch_data = {
-        "total_switches": 0,
-        "unique_users": set()
-    }
-    
-    # Define patterns to look for
-    patterns = {
-        "Open Employee Dossier from a document": re.compile(r'Open Employee Dossier called'),
-        "Assign document(s) to an employee": re.compile(r'Assign (\d+) documents to employee'),
-        "Copy document(s) to employee": re.compile(r'Copy (\d+) documents to employee'),
-        # Add more patterns here for other functions you want to track
-    }
-    
-    # Pattern for document viewing
-    document_view_pattern = re.compile(r'View Page: Viewing document\. Mimetype:([^\.]+)\.')
-    
-    # Pattern for document downloads
-    document_download_pattern = re.compile(r'Download: Downloaded document: (\d+) bytes')
-    
-    # Pattern for Excel exports
-    excel_export_pattern = re.compile(r'Excel export: ResultType=\'([^\']+)\', ResultsView=\'([^\']+)\', FileName=\'([^\']+)\', FileSize=([^\ ]+)')
-    
-    # Pattern for resultgrid toggle events
-    toggle_pattern = re.compile(r'Element toggled: element:\'\{[^}]+\}([^\']+)\'')
-    
-    # Pattern for view page switches
-    view_switch_pattern = re.compile(r'View Page: Switched to other document\. Position:\d+')
-    
-    # Process log files - look in splits subdirectories
-    log_files = []
-    
-    # Find all log files in all subdirectories of logs_dir
-    for root, dirs, files in os.walk(logs_dir):
-        for file in files:
-            if file.endswith('.log'):
-                log_files.append(os.path.join(root, file))
-    
-    log_files = sorted(log_files)
+    # Find all log files in all subdirectories of logs_dir. They are sorted by
+    # path string, as before, so the merge order and output stay reproducible.
+    log_files = sorted(find_log_files(logs_dir), key=str)
     total_files = len(log_files)
     
     if verbose:
         print(f"Found {total_files} log files to process")
     
-    for i, log_file in enumerate(log_files):
+    # Scan the files in parallel and merge the per-file results
+    totals = _new_aggregates()
+    for i, partial in enumerate(_scan_log_files(log_files)):
         if verbose and i % 10 == 0:
-            print(f"Processing file {i+1}/{total_files}: {os.path.basename(log_file)}")
-            
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                # Check each pattern
-                for function_name, pattern in patterns.items():
-                    match = pattern.search(line)
-                    if match:
-                        # Extract user
-                        user = extract_user_from_log(line)
-                        
-                        # Update function data
-                        function_data[function_name]["total_usage"] += 1
-                        function_data[function_name]["unique_users"].add(user)
-                        
-                        # If this is an Assign or Copy function, capture document count
-                        if function_name in ["Assign document(s) to an employee", "Copy document(s) to employee"] and match.groups():
-                            doc_count = int(match.group(1))
-                            function_data[function_name]["document_counts"].append(doc_count)
-                
-                # Check for document viewing
-                doc_view_match = document_view_pattern.search(line)
-                if doc_view_match:
-                    # Extract mimetype and user
-                    mimetype = doc_view_match.group(1).strip()
-                    user = extract_user_from_log(line)
-                    
-                    # Update document view data
-                    document_view_data[mimetype]["total_views"] += 1
-                    document_view_data[mimetype]["unique_users"].add(user)
-                
-                # Check for document downloads
-                doc_download_match = document_download_pattern.search(line)
-                if doc_download_match:
-                    # Extract download size and user
-                    size_bytes = int(doc_download_match.group(1))
-                    user = extract_user_from_log(line)
-                    
-                    # Update document download data
-                    document_download_data["total_downloads"] += 1
-                    document_download_data["unique_users"].add(user)
-                    document_download_data["sizes"].append(size_bytes)
-                
-                # Check for Excel exports
-                excel_export_match = excel_export_pattern.search(line)
-                if excel_export_match:
-                    # Extract export details and user
-                    result_type = excel_export_match.group(1)  # e.g., 'rs', 'es', etc.
-                    result_view = excel_export_match.group(2)
-                    file_name = excel_export_match.group(3)
-                    
-                    # Parse file size (e.g., "91,55 KB")
-                    file_size_str = excel_export_match.group(4)
-                    try:
-                        # Handle different file size formats (try both comma and dot as decimal separator)
-                        file_size_value = float(file_size_str.replace(',', '.').split()[0])
-                        file_size_unit = file_size_str.split()[-1]
-                        
-                        # Convert to bytes for consistency
-                        if file_size_unit.lower() == 'kb':
-                            file_size_bytes = file_size_value * 1024
-                        elif file_size_unit.lower() == 'mb':
-                            file_size_bytes = file_size_value * 1024 * 1024
-                        else:
-                            file_size_bytes = file_size_value  # Assume bytes
-                    except (ValueError, IndexError):
-                        file_size_bytes = 0  # Default if parsing fails
-                    
-                    user = extract_user_from_log(line)
-                    
-                    # Update overall Excel export data
-                    excel_export_data["total_exports"] += 1
-                    excel_export_data["unique_users"].add(user)
-                    
-                    # Update data for specific result type
-                    excel_export_data["by_result_type"][result_type]["total_exports"] += 1
-                    excel_export_data["by_result_type"][result_type]["unique_users"].add(user)
-                    excel_export_data["by_result_type"][result_type]["file_sizes"].append(file_size_bytes)
-                
-                # Check for resultgrid toggle events
-                toggle_match = toggle_pattern.search(line)
-                if toggle_match:
-                    # Extract element name (without namespace) and user
-                    element_name = toggle_match.group(1)
-                    user = extract_user_from_log(line)
-                    
-                    # Update overall toggle data
-                    toggle_data["total_toggles"] += 1
-                    toggle_data["unique_users"].add(user)
-                    
-                    # Update data for specific element
-                    toggle_data["by_element"][element_name]["total_toggles"] += 1
-                    toggle_data["by_element"][element_name]["unique_users"].add(user)
-                
-                # Check for view page switches
-                view_switch_match = view_switch_pattern.search(line)
-                if view_switch_match:
-                    # Extract user
-                    user = extract_user_from_log(line)
-                    
-                    # Update view switch data
-                    view_switch_data["total_switches"] += 1
-                    view_switch_data["unique_users"].add(user)
-    
-    # Convert to dataframe
-    records = []
-    for function_name, data in function_data.items():
-        record = {
-            "function_name": function_name,
-            "total_usage": data["total_usage"],
-            "unique_users": len(data["unique_users"])
-        }
-        
-        # Add document count statistics for Assign and Copy functions
-        if function_name in ["Assign document(s) to an employee", "Copy document(s) to employee"] and data["document_counts"]:
-            doc_counts = data["document_counts"]
-            record["total_documents"] = sum(doc_counts)
-            record["avg_documents"] = sum(doc_counts) / len(doc_counts)
-            record["min_documents"] = min(doc_counts)
-            record["max_documents"] = max(doc_counts)
+            print(f"Processing file {i+1}/{total_files}: {os.path.basename(log_files[i])}")
+        _merge_aggregates(totals, partial)
+    
+    function_events = totals["function_events"]
+    document_view_data = totals["document_views"]
+    document_download_data = totals["document_downloads"]
+    excel_export_data = totals["excel_exports"]
+    toggle_data = totals["toggles"]
+    view_switch_data = totals["view_switches"]
+    
+    # Aggregate function events, document count statistics only apply to Assign and Copy
+    if function_events["function_name"]:
+        events = pl.DataFrame(function_events, schema={"function_name": pl.Utf8, "user": pl.Utf8, "doc_count": pl.Int64})
+        
+        aggregations = [
+            pl.len().alias("total_usage"),
+            pl.col("user").n_unique().alias("unique_users")
+        ]
+        # Only add the document columns when an Assign or Copy was seen
+        if events["doc_count"].null_count() < events.height:
+            aggregations += [
+                pl.when(pl.col("doc_count").count() > 0).then(pl.col("doc_count").sum()).alias("total_documents"),
+                pl.col("doc_count").mean().alias("avg_documents"),
+                pl.col("doc_count").min().alias("min_documents"),
+                pl.col("doc_count").max().alias("max_documents")
+            ]
         
-        records.append(record)
-    
-    # Create dataframe for function data
-    if records:
-        df_functions = pl.DataFrame(records)
+        df_functions = events.group_by("function_name", maintain_order=True).agg(aggregations)
         
         # Save to CSV
         output_file = output_dir / "misc_functions.csv"
@@ -234,7 +368,7 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
         
         if verbose:
             print(f"Saved miscellaneous functions data to {output_file}")
-            print(f"Found {len(records)} functions with data")
+            print(f"Found {df_functions.height} functions with data")
     else:
         if verbose:
             print("No function call data found in logs")
@@ -256,18 +390,19 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
         if verbose:
             print(f"Saved empty miscellaneous functions data template to {output_file}")
     
-    # Process document view data
-    doc_records = []
+    # Process document view data, built column-wise to skip row-by-row schema inference
+    doc_columns = {"mimetype": [], "total_views": [], "unique_users": []}
     for mimetype, data in document_view_data.items():
-        doc_records.append({
-            "mimetype": mimetype,
-            "total_views": data["total_views"],
-            "unique_users": len(data["unique_users"])
-        })
+        doc_columns["mimetype"].append(mimetype)
+        doc_columns["total_views"].append(data["total_views"])
+        doc_columns["unique_users"].append(len(data["unique_users"]))
     
     # Create dataframe for document view data
-    if doc_records:
-        df_doc_views = pl.DataFrame(doc_records)
+    if doc_columns["mimetype"]:
+        df_doc_views = pl.DataFrame(
+            doc_columns,
+            schema={"mimetype": pl.Utf8, "total_views": pl.Int64, "unique_users": pl.Int64}
+        )
         
         # Save to CSV
         doc_output_file = output_dir / "document_views.csv"
@@ -275,7 +410,7 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
         
         if verbose:
             print(f"Saved document view data to {doc_output_file}")
-            print(f"Found {len(doc_records)} mimetypes with data")
+            print(f"Found {len(doc_columns['mimetype'])} mimetypes with data")
     else:
         if verbose:
             print("No document view data found in logs")
@@ -299,14 +434,15 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
     
     # Process document download data
     if document_download_data["total_downloads"] > 0:
-        # Calculate size statistics
-        sizes = document_download_data["sizes"]
-        avg_size = sum(sizes) / len(sizes)
-        min_size = min(sizes)
-        max_size = max(sizes)
-        median_size = sorted(sizes)[len(sizes) // 2]
-        
-        # Size distribution categories (in bytes)
+        # Calculate size statistics; the "higher" median matches sorted(sizes)[len(sizes) // 2]
+        sizes = pl.Series("size", document_download_data["sizes"], dtype=pl.Int64)
+        avg_size = sizes.mean()
+        min_size = sizes.min()
+        max_size = sizes.max()
+        median_size = sizes.quantile(0.5, "higher")
+        
+        # Size distribution categories (in bytes), binned in one vectorized pass.
+        # Bins are closed on the left, so a size of exactly 10KB counts as "10KB - 100KB".
         size_categories = {
             "< 10KB": 0,
             "10KB - 100KB": 0,
@@ -315,37 +451,34 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
             "> 10MB": 0
         }
         
-        for size in sizes:
-            if size < 10 * 1024:  # < 10KB
-                size_categories["< 10KB"] += 1
-            elif size < 100 * 1024:  # 10KB - 100KB
-                size_categories["10KB - 100KB"] += 1
-            elif size < 1024 * 1024:  # 100KB - 1MB
-                size_categories["100KB - 1MB"] += 1
-            elif size < 10 * 1024 * 1024:  # 1MB - 10MB
-                size_categories["1MB - 10MB"] += 1
-            else:  # > 10MB
-                size_categories["> 10MB"] += 1
-        
-        # Create summary records
-        download_records = [
-            {"metric": "total_downloads", "value": document_download_data["total_downloads"]},
-            {"metric": "unique_users", "value": len(document_download_data["unique_users"])},
-            {"metric": "avg_size_bytes", "value": avg_size},
-            {"metric": "min_size_bytes", "value": min_size},
-            {"metric": "max_size_bytes", "value": max_size},
-            {"metric": "median_size_bytes", "value": median_size}
+        size_bins = sizes.cut(
+            [10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024],
+            labels=list(size_categories),
+            left_closed=True
+        )
+        for category, count in size_bins.value_counts().iter_rows():
+            size_categories[category] = count
+        
+        # Create summary columns
+        metrics = [
+            "total_downloads", "unique_users", "avg_size_bytes",
+            "min_size_bytes", "max_size_bytes", "median_size_bytes"
+        ]
+        values = [
+            document_download_data["total_downloads"], len(document_download_data["unique_users"]),
+            avg_size, min_size, max_size, median_size
         ]
         
-        # Add size distribution records
+        # Add size distribution rows
         for category, count in size_categories.items():
-            download_records.append({
-                "metric": f"size_category_{category.replace(' ', '_').replace('<', 'lt').replace('>', 'gt')}",
-                "value": count
-            })
+            metrics.append(f"size_category_{category.replace(' ', '_').replace('<', 'lt').replace('>', 'gt')}")
+            values.append(count)
         
         # Create dataframe for download data
-        df_downloads = pl.DataFrame(download_records)
+        df_downloads = pl.DataFrame(
+            {"metric": metrics, "value": values},
+            schema={"metric": pl.Utf8, "value": pl.Float64}
+        )
         
         # Save to CSV
         download_output_file = output_dir / "document_downloads.csv"
@@ -372,16 +505,27 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
             print(f"Saved empty document download data template to {download_output_file}")
     
     # Process Excel export data
-    excel_export_records = []
+    excel_export_columns = {
+        "result_type": [],
+        "result_type_description": [],
+        "total_exports": [],
+        "unique_users": [],
+        "avg_file_size_bytes": []
+    }
+    
+    def add_excel_export_row(result_type, description, total_exports, unique_users, avg_file_size):
+        excel_export_columns["result_type"].append(result_type)
+        excel_export_columns["result_type_description"].append(description)
+        excel_export_columns["total_exports"].append(total_exports)
+        excel_export_columns["unique_users"].append(unique_users)
+        excel_export_columns["avg_file_size_bytes"].append(avg_file_size)
     
     # Overall Excel export statistics
     if excel_export_data["total_exports"] > 0:
-        excel_export_records.append({
-            "result_type": "overall",
-            "result_type_description": "All Types",
-            "total_exports": excel_export_data["total_exports"],
-            "unique_users": len(excel_export_data["unique_users"])
-        })
+        add_excel_export_row(
+            "overall", "All Types",
+            excel_export_data["total_exports"], len(excel_export_data["unique_users"]), None
+        )
         
         # Result type specific statistics
         result_type_descriptions = {
@@ -402,16 +546,22 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
             # Get description for result type
             result_type_desc = result_type_descriptions.get(result_type, result_type)
             
-            excel_export_records.append({
-                "result_type": result_type,
-                "result_type_description": result_type_desc,
-                "total_exports": data["total_exports"],
-                "unique_users": len(data["unique_users"]),
-                "avg_file_size_bytes": avg_size
-            })
+            add_excel_export_row(
+                result_type, result_type_desc,
+                data["total_exports"], len(data["unique_users"]), avg_size
+            )
         
         # Create dataframe for Excel export data
-        df_excel_exports = pl.DataFrame(excel_export_records)
+        df_excel_exports = pl.DataFrame(
+            excel_export_columns,
+            schema={
+                "result_type": pl.Utf8,
+                "result_type_description": pl.Utf8,
+                "total_exports": pl.Int64,
+                "unique_users": pl.Int64,
+                "avg_file_size_bytes": pl.Float64
+            }
+        )
         
         # Save to CSV
         excel_output_file = output_dir / "excel_exports.csv"
@@ -441,28 +591,27 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
             print(f"Saved empty Excel export data template to {excel_output_file}")
     
     # Process resultgrid toggle data
-    toggle_records = []
+    toggle_columns = {"element": [], "element_description": [], "total_toggles": [], "unique_users": []}
     
     # Overall toggle statistics
     if toggle_data["total_toggles"] > 0:
-        toggle_records.append({
-            "element": "overall",
-            "element_description": "All Elements",
-            "total_toggles": toggle_data["total_toggles"],
-            "unique_users": len(toggle_data["unique_users"])
-        })
+        toggle_columns["element"].append("overall")
+        toggle_columns["element_description"].append("All Elements")
+        toggle_columns["total_toggles"].append(toggle_data["total_toggles"])
+        toggle_columns["unique_users"].append(len(toggle_data["unique_users"]))
         
         # Element specific statistics
         for element, data in toggle_data["by_element"].items():
-            toggle_records.append({
-                "element": element,
-                "element_description": element,  # For now, same as element name
-                "total_toggles": data["total_toggles"],
-                "unique_users": len(data["unique_users"])
-            })
+            toggle_columns["element"].append(element)
+            toggle_columns["element_description"].append(element)  # For now, same as element name
+            toggle_columns["total_toggles"].append(data["total_toggles"])
+            toggle_columns["unique_users"].append(len(data["unique_users"]))
         
         # Create dataframe for toggle data
-        df_toggles = pl.DataFrame(toggle_records)
+        df_toggles = pl.DataFrame(
+            toggle_columns,
+            schema={"element": pl.Utf8, "element_description": pl.Utf8, "total_toggles": pl.Int64, "unique_users": pl.Int64}
+        )
         
         # Save to CSV
         toggle_output_file = output_dir / "resultgrid_toggles.csv"
@@ -491,17 +640,16 @@ def analyze_misc_functions(logs_dir, output_dir, verbose=False):
             print(f"Saved empty resultgrid toggle data template to {toggle_output_file}")
     
     # Process view page switch data
-    view_switch_records = []
-    
     if view_switch_data["total_switches"] > 0:
-        view_switch_records.append({
-            "function_name": "View Page: Switch to other document",
-            "total_switches": view_switch_data["total_switches"],
-            "unique_users": len(view_switch_data["unique_users"])
-        })
-        
         # Create dataframe for view switch data
-        df_view_switches = pl.DataFrame(view_switch_records)
+        df_view_switches = pl.DataFrame(
+            {
+                "function_name": ["View Page: Switch to other document"],
+                "total_switches": [view_switch_data["total_switches"]],
+                "unique_users": [len(view_switch_data["unique_users"])]
+            },
+            schema={"function_name": pl.Utf8, "total_switches": pl.Int64, "unique_users": pl.Int64}
+        )
         
         # Save to CSV
         view_switch_output_file = output_dir / "view_page_switches.csv"
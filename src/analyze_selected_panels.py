@@ -6,12 +6,17 @@ Business Rules:
 - Maximum 5 concurrent employee panels allowed per user
 - Base panels (employees, documents, import, reports, management) don't count toward limit
 """
+import os
 import re
+import mmap
+import sys
 import csv
 import logging
 from pathlib import Path
-from typing import Dict, Set, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Set, List, Sequence, Tuple, Union
 from collections import defaultdict, Counter
+import heapq
 import json
 
 # Setup logging
@@ -21,17 +26,35 @@ logger = logging.getLogger(__name__)
 # Base panels that are standard across all users
 BASE_PANELS = {'employees', 'documents', 'import', 'reports', 'management'}
 
+# Slot of each base panel in PanelTracker.base_panel_activations
+BASE_PANEL_INDEX = {'employees': 0, 'documents': 1, 'import': 2, 'reports': 3, 'management': 4}
+BASE_PANEL_NAMES = tuple(BASE_PANEL_INDEX)
+
 # Business rules
 MAX_CONCURRENT_EMPLOYEE_PANELS = 5
 
-# Regex patterns for panel operations
-PANEL_ACTIVATED_PATTERN = re.compile(r'Switch Panel Activated: (?P<panel>\w+)')
-PANEL_ADDED_PATTERN = re.compile(r'Switch Panel Added: (?P<panel>\w+)')
-PANEL_REMOVED_PATTERN = re.compile(r'Switch Panel Removed: (?P<panel>\w+)')
+# Panel operations follow PANEL_OPERATION_LITERAL and are parsed by byte offsets.
+# The regex is only the fallback for non-ASCII lines; those are decoded first,
+# so \w+ still matches non-ASCII panel names.
+PANEL_OPERATION_LITERAL = b'Switch Panel '
+PANEL_OPERATION_PATTERN = re.compile(r'Switch Panel (?P<operation>Activated|Added|Removed): (?P<panel>\w+)')
+PANEL_OPERATION_PREFIXES = ((b'Activated: ', 'Activated'), (b'Added: ', 'Added'), (b'Removed: ', 'Removed'))
+
+# Bytes matched by \w in an ASCII line
+WORD_BYTES = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
 
 # Standard patterns from split_logs_by_user.py
 DATE_PATTERN = re.compile(r'^(?P<date>\d{4}-\d{2}-\d{2})\s+(?P<time>\d{2}:\d{2}:\d{2}\.\d+)')
-USER_PATTERN = re.compile(r'\[User:\s*(?P<user>[A-Z0-9]+)\]')
+
+# User pattern on the raw bytes of a line; user ids are ASCII only
+USER_PATTERN = re.compile(rb'\[User:\s*(?P<user>[A-Z0-9]+)\]')
+USER_LITERAL = b'[User:'
+
+# Log files are split into lines in windows of this size
+READ_CHUNK_SIZE = 1 << 20
+
+# Below this many files, scanning in a process pool costs more than it saves
+MIN_FILES_FOR_POOL = 4
 
 
 class PanelTracker:
@@ -39,18 +62,23 @@ class PanelTracker:
     
     def __init__(self, user: str):
         self.user = user
-        self.base_panel_activations = Counter()
+        self.base_panel_activations = [0] * len(BASE_PANEL_NAMES)  # Indexed by BASE_PANEL_INDEX
+        self.base_panel_activation_order = []  # Base panel slots in order of first activation
         self.employee_panels_opened = set()
-        self.current_employee_panels = set()
+        self.current_employee_panels = {}  # Used as an ordered set, oldest added panel first
         self.max_concurrent_employee_panels = 0
         self.employee_panel_switches = 0
         self.last_activated_employee_panel = None
-        self.activation_history = []  # Track order of panel activations
+        self.activation_history = {}  # Used as an ordered set, tracks order of panel activations
         
     def process_panel_activated(self, panel: str):
         """Process a panel activation event."""
-        if panel in BASE_PANELS:
-            self.base_panel_activations[panel] += 1
+        base_index = BASE_PANEL_INDEX.get(panel)
+        if base_index is not None:
+            activations = self.base_panel_activations
+            if not activations[base_index]:
+                self.base_panel_activation_order.append(base_index)
+            activations[base_index] += 1
         else:
             # This is an employee panel
             # Check if this is a switch to a previously activated panel
@@ -66,47 +94,44 @@ class PanelTracker:
             # Update activation tracking
             self.last_activated_employee_panel = panel
             if panel not in self.activation_history:
-                self.activation_history.append(panel)
+                self.activation_history[panel] = None
     
     def process_panel_added(self, panel: str):
         """Process a panel added event."""
         if panel not in BASE_PANELS:
             # This is an employee panel
             self.employee_panels_opened.add(panel)
-            self.current_employee_panels.add(panel)
+            current_panels = self.current_employee_panels
+            current_panels[panel] = None
             
             # Enforce business rule: maximum 5 concurrent employee panels
-            if len(self.current_employee_panels) > MAX_CONCURRENT_EMPLOYEE_PANELS:
+            if len(current_panels) > MAX_CONCURRENT_EMPLOYEE_PANELS:
                 # Remove the oldest panel to stay within limit
                 # Note: In real logs, we should see corresponding "Switch Panel Removed" events
                 # If not, this indicates potential log data issues or forced panel closure
-                oldest_panels = list(self.current_employee_panels)
-                panels_to_remove = oldest_panels[:len(self.current_employee_panels) - MAX_CONCURRENT_EMPLOYEE_PANELS]
-                for panel_to_remove in panels_to_remove:
-                    self.current_employee_panels.discard(panel_to_remove)
+                del current_panels[next(iter(current_panels))]
             
-            self.max_concurrent_employee_panels = max(
-                self.max_concurrent_employee_panels, 
-                len(self.current_employee_panels)
-            )
+            if len(current_panels) > self.max_concurrent_employee_panels:
+                self.max_concurrent_employee_panels = len(current_panels)
     
     def process_panel_removed(self, panel: str):
         """Process a panel removed event."""
         if panel not in BASE_PANELS:
             # This is an employee panel
-            self.current_employee_panels.discard(panel)
+            self.current_employee_panels.pop(panel, None)
             if self.last_activated_employee_panel == panel:
                 self.last_activated_employee_panel = None
             # Remove from activation history when panel is closed
-            if panel in self.activation_history:
-                self.activation_history.remove(panel)
+            self.activation_history.pop(panel, None)
     
     def get_summary(self) -> Dict:
         """Get summary statistics for this user."""
         return {
             'user': self.user,
-            'base_panel_activations': dict(self.base_panel_activations),
-            'total_base_activations': sum(self.base_panel_activations.values()),
+            'base_panel_activations': {
+                BASE_PANEL_NAMES[i]: self.base_panel_activations[i] for i in self.base_panel_activation_order
+            },
+            'total_base_activations': sum(self.base_panel_activations),
             'unique_employee_panels_opened': len(self.employee_panels_opened),
             'max_concurrent_employee_panels': self.max_concurrent_employee_panels,
             'employee_panel_switches': self.employee_panel_switches,
@@ -114,67 +139,179 @@ class PanelTracker:
         }
 
 
-def analyze_panel_usage(log_files: List[Path]) -> Dict:
+def iter_log_lines(log_file: Union[str, os.PathLike]):
+    """
+    Yield the lines of a log file as bytes, without line endings.
+    
+    The file is memory-mapped and split in windows of about READ_CHUNK_SIZE
+    that end on a line break, so no partial line is carried between reads.
+    """
+    with open(log_file, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            start = 0
+            while start < size:
+                end = mm.rfind(b'\n', start, start + READ_CHUNK_SIZE) + 1
+                if not end:
+                    # No line break in this window: take the whole (long or last) line
+                    end = mm.find(b'\n', start) + 1 or size
+                lines = mm[start:end].split(b'\n')
+                if not lines[-1]:
+                    lines.pop()
+                yield from lines
+                start = end
+
+
+def parse_panel_operation(line: bytes):
+    """
+    Find the first panel operation in a log line.
+    
+    Returns:
+        Tuple of (operation, panel) with the panel name interned, or None
+    """
+    start = line.find(PANEL_OPERATION_LITERAL)
+    if start < 0:
+        return None
+    
+    if not line.isascii():
+        match = PANEL_OPERATION_PATTERN.search(line.decode('utf-8', errors='ignore'))
+        if match:
+            return match.group('operation'), sys.intern(match.group('panel'))
+        return None
+    
+    literal_length = len(PANEL_OPERATION_LITERAL)
+    line_length = len(line)
+    while start >= 0:
+        start += literal_length
+        for prefix, operation in PANEL_OPERATION_PREFIXES:
+            if line.startswith(prefix, start):
+                panel_start = end = start + len(prefix)
+                while end < line_length and line[end] in WORD_BYTES:
+                    end += 1
+                if end > panel_start:
+                    return operation, sys.intern(line[panel_start:end].decode('ascii'))
+                break
+        start = line.find(PANEL_OPERATION_LITERAL, start)
+    return None
+
+
+def scan_panel_events(log_file: Union[str, os.PathLike]) -> Tuple[int, List[Tuple], str]:
+    """
+    Scan one log file for panel operations.
+    
+    Panel state carries over between a user's files, so files are scanned
+    independently and their events are replayed in file order afterwards.
+    
+    Returns:
+        Tuple of (lines processed, events, error message or None). Each event is
+        (user, operation, panel); the first line of each user in the file is also
+        recorded as (user, None, None) so trackers are created in the same order.
+    """
+    lines_processed = 0
+    events = []
+    seen_users = set()
+    user = None
+    user_tag = None
+    
+    # Bind the methods used per line once, outside the loop
+    find_user = USER_PATTERN.search
+    parse_operation = parse_panel_operation
+    append_event = events.append
+    
+    try:
+        for line in iter_log_lines(log_file):
+            lines_processed += 1
+            
+            user_start = line.find(USER_LITERAL)
+            if user_start < 0:
+                continue
+            
+            # Split logs hold one user, so most lines repeat the previous user tag
+            # verbatim and can skip the regex
+            if user_tag is None or not line.startswith(user_tag, user_start):
+                # Extract user from line, starting the regex at the first user marker
+                # so it matches at its first attempt instead of trying every offset
+                user_match = find_user(line, user_start)
+                if not user_match:
+                    continue
+                
+                user_tag = user_match.group(0)
+                user = user_match.group('user').decode('ascii')
+                if user not in seen_users and user != 'Unknown':
+                    seen_users.add(user)
+                    append_event((user, None, None))
+            
+            if user == 'Unknown':
+                continue
+            
+            # Check for panel operations. Interned panel names hit BASE_PANELS and
+            # the tracker sets by identity, and each name is pickled once per file
+            panel_operation = parse_operation(line)
+            if panel_operation is not None:
+                append_event((user, *panel_operation))
+    
+    except Exception as e:
+        return lines_processed, events, str(e)
+    
+    return lines_processed, events, None
+
+
+def _scan_log_files(log_files: Sequence[Union[str, os.PathLike]]):
+    """Yield the scan result of each log file, in file order."""
+    if len(log_files) < MIN_FILES_FOR_POOL:
+        yield from map(scan_panel_events, log_files)
+        return
+    
+    with ProcessPoolExecutor() as executor:
+        yield from executor.map(scan_panel_events, log_files, chunksize=4)
+
+
+def analyze_panel_usage(log_files: Sequence[Union[str, os.PathLike]]) -> Dict:
     """
     Analyze panel usage across all log files.
     
     Args:
-        log_files: List of log file paths to analyze
+        log_files: Log file paths to analyze, as strings or path-like objects
         
     Returns:
         Dictionary with analysis results
     """
     user_trackers = {}
+    user_handlers = {}  # Bound PanelTracker handler for each panel operation, per user
+    # Panel names arrive as separate objects from every file; keep one per name
+    # so the trackers' sets across users share them
+    panel_names = {}
     total_lines_processed = 0
     
     logger.info(f"Starting panel analysis on {len(log_files)} files")
     
-    for log_file in log_files:
+    for log_file, (lines_processed, events, error) in zip(log_files, _scan_log_files(log_files)):
         logger.info(f"Processing {log_file}")
         
-        try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    line = line.strip()
-                    total_lines_processed += 1
-                    
-                    # Extract user from line
-                    user_match = USER_PATTERN.search(line)
-                    if not user_match:
-                        continue
-                    
-                    user = user_match.group('user')
-                    if user == 'Unknown':
-                        continue
-                    
-                    # Initialize tracker for new users
-                    if user not in user_trackers:
-                        user_trackers[user] = PanelTracker(user)
-                    
-                    tracker = user_trackers[user]
-                    
-                    # Check for panel operations
-                    if 'Switch Panel Activated:' in line:
-                        match = PANEL_ACTIVATED_PATTERN.search(line)
-                        if match:
-                            tracker.process_panel_activated(match.group('panel'))
-                    
-                    elif 'Switch Panel Added:' in line:
-                        match = PANEL_ADDED_PATTERN.search(line)
-                        if match:
-                            tracker.process_panel_added(match.group('panel'))
-                    
-                    elif 'Switch Panel Removed:' in line:
-                        match = PANEL_REMOVED_PATTERN.search(line)
-                        if match:
-                            tracker.process_panel_removed(match.group('panel'))
-                    
-                    if total_lines_processed % 50000 == 0:
-                        logger.info(f"Processed {total_lines_processed} lines...")
+        # Replay the events of this file in order
+        for user, operation, panel in events:
+            handlers = user_handlers.get(user)
+            if handlers is None:
+                # Initialize tracker for new users
+                tracker = user_trackers[user] = PanelTracker(user)
+                handlers = user_handlers[user] = {
+                    'Activated': tracker.process_panel_activated,
+                    'Added': tracker.process_panel_added,
+                    'Removed': tracker.process_panel_removed,
+                }
+            if operation is not None:
+                handlers[operation](panel_names.setdefault(panel, panel))
+        
+        if (total_lines_processed + lines_processed) // 50000 > total_lines_processed // 50000:
+            logger.info(f"Processed {total_lines_processed + lines_processed} lines...")
+        total_lines_processed += lines_processed
         
-        except Exception as e:
-            logger.error(f"Error processing {log_file}: {e}")
-            continue
+        if error is not None:
+            logger.error(f"Error processing {log_file}: {error}")
     
     logger.info(f"Completed processing {total_lines_processed} lines")
     
@@ -200,28 +337,29 @@ def generate_aggregate_stats(user_summaries: List[Dict]) -> Dict:
     # Base panel usage aggregation
     base_panel_totals = Counter()
     for summary in user_summaries:
-        for panel, count in summary['base_panel_activations'].items():
-            base_panel_totals[panel] += count
+        base_panel_totals.update(summary['base_panel_activations'])
     
     # Concurrent employee panels distribution
-    concurrent_distribution = Counter()
-    for summary in user_summaries:
-        concurrent_distribution[summary['max_concurrent_employee_panels']] += 1
+    concurrent_distribution = Counter(s['max_concurrent_employee_panels'] for s in user_summaries)
     
     # Employee panel switching statistics
     users_with_switches = sum(1 for s in user_summaries if s['has_switched_employee_panels'])
     switch_percentage = (users_with_switches / len(user_summaries) * 100) if user_summaries else 0
     
     # Top users by various metrics
-    top_base_users = sorted(user_summaries, key=lambda x: x['total_base_activations'], reverse=True)[:10]
-    top_employee_panel_users = sorted(user_summaries, key=lambda x: x['unique_employee_panels_opened'], reverse=True)[:10]
-    top_concurrent_users = sorted(user_summaries, key=lambda x: x['max_concurrent_employee_panels'], reverse=True)[:10]
-    top_switchers = sorted(user_summaries, key=lambda x: x['employee_panel_switches'], reverse=True)[:10]
+    top_base_users = heapq.nlargest(10, user_summaries, key=lambda x: x['total_base_activations'])
+    top_employee_panel_users = heapq.nlargest(10, user_summaries, key=lambda x: x['unique_employee_panels_opened'])
+    top_concurrent_users = heapq.nlargest(10, user_summaries, key=lambda x: x['max_concurrent_employee_panels'])
+    top_switchers = heapq.nlargest(10, user_summaries, key=lambda x: x['employee_panel_switches'])
+    
+    # Base panels by activations, most activated first (ties keep first-seen order)
+    panels_by_activations = base_panel_totals.most_common()
     
     return {
         'base_panel_usage': {
             'total_activations_by_panel': dict(base_panel_totals),
-            'most_popular_base_panel': base_panel_totals.most_common(1)[0] if base_panel_totals else None,
+            'panels_by_activations': panels_by_activations,
+            'most_popular_base_panel': panels_by_activations[0] if panels_by_activations else None,
             'top_users_by_base_activations': [
                 {'user': u['user'], 'total_activations': u['total_base_activations']} 
                 for u in top_base_users
@@ -308,112 +446,115 @@ def save_user_summaries_csv(user_summaries: List[Dict], output_file: Path):
         'has_switched_employee_panels'
     ]
     
+    rows = []
+    for summary in user_summaries:
+        base_activations = summary['base_panel_activations']
+        rows.append((
+            summary['user'],
+            summary['total_base_activations'],
+            # Individual base panel counts
+            base_activations.get('employees', 0),
+            base_activations.get('documents', 0),
+            base_activations.get('import', 0),
+            base_activations.get('reports', 0),
+            base_activations.get('management', 0),
+            summary['unique_employee_panels_opened'],
+            summary['max_concurrent_employee_panels'],
+            summary['employee_panel_switches'],
+            summary['has_switched_employee_panels']
+        ))
+    
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for summary in user_summaries:
-            row = {
-                'user': summary['user'],
-                'total_base_activations': summary['total_base_activations'],
-                'unique_employee_panels_opened': summary['unique_employee_panels_opened'],
-                'max_concurrent_employee_panels': summary['max_concurrent_employee_panels'],
-                'employee_panel_switches': summary['employee_panel_switches'],
-                'has_switched_employee_panels': summary['has_switched_employee_panels']
-            }
-            
-            # Add individual base panel counts
-            base_activations = summary['base_panel_activations']
-            for panel in ['employees', 'documents', 'import', 'reports', 'management']:
-                row[f'{panel}_activations'] = base_activations.get(panel, 0)
-            
-            writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
 
 
 def save_base_panel_usage_csv(base_usage: Dict, output_file: Path):
     """Save base panel usage statistics to CSV."""
-    rows = [['panel', 'total_activations']]
+    # Fields are fixed panel names and integers, so no CSV quoting is needed;
+    # rows end in \r\n like the csv module's default dialect
+    out = ['panel,total_activations\r\n']
     
-    for panel, count in sorted(base_usage['total_activations_by_panel'].items(), 
-                              key=lambda x: x[1], reverse=True):
-        rows.append([panel, count])
+    for panel, count in base_usage['panels_by_activations']:
+        out.append(f'{panel},{count}\r\n')
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+        f.write(''.join(out))
 
 
 def save_concurrent_distribution_csv(emp_usage: Dict, output_file: Path):
     """Save concurrent panel distribution to CSV."""
-    rows = [['concurrent_panels', 'user_count', 'percentage']]
+    out = ['concurrent_panels,user_count,percentage\r\n']
     
     total_users = sum(emp_usage['users_by_max_concurrent'].values())
     
     for key, count in sorted(emp_usage['users_by_max_concurrent'].items()):
         percentage = (count / total_users * 100) if total_users > 0 else 0
-        rows.append([key, count, f"{percentage:.2f}%"])
+        out.append(f'{key},{count},{percentage:.2f}%\r\n')
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+        f.write(''.join(out))
 
 
 def save_top_performers_csv(stats: Dict, output_file: Path):
     """Save top performing users across different metrics to CSV."""
-    rows = [['metric', 'rank', 'user', 'value']]
+    # User ids only contain A-Z and 0-9, so no CSV quoting is needed
+    out = ['metric,rank,user,value\r\n']
     
     # Top base panel users
     for i, user_data in enumerate(stats['base_panel_usage']['top_users_by_base_activations'][:10], 1):
-        rows.append(['base_activations', i, user_data['user'], user_data['total_activations']])
+        out.append(f"base_activations,{i},{user_data['user']},{user_data['total_activations']}\r\n")
     
     # Top employee panel users
     for i, user_data in enumerate(stats['employee_panel_usage']['top_users_by_unique_panels'][:10], 1):
-        rows.append(['unique_employee_panels', i, user_data['user'], user_data['unique_panels']])
+        out.append(f"unique_employee_panels,{i},{user_data['user']},{user_data['unique_panels']}\r\n")
     
     # Top concurrent users
     for i, user_data in enumerate(stats['employee_panel_usage']['top_users_by_concurrent'][:10], 1):
-        rows.append(['max_concurrent_panels', i, user_data['user'], user_data['max_concurrent']])
+        out.append(f"max_concurrent_panels,{i},{user_data['user']},{user_data['max_concurrent']}\r\n")
     
     # Top switchers
     for i, user_data in enumerate(stats['switching_behavior']['top_switchers'][:10], 1):
-        rows.append(['panel_switches', i, user_data['user'], user_data['switches']])
+        out.append(f"panel_switches,{i},{user_data['user']},{user_data['switches']}\r\n")
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+        f.write(''.join(out))
 
 
 def save_aggregate_summary_csv(results: Dict, output_file: Path):
     """Save aggregate summary statistics to CSV."""
-    rows = [['metric', 'value', 'category']]
+    out = ['metric,value,category\r\n']
     
     # Basic metrics
-    rows.append(['total_lines_processed', results['total_lines_processed'], 'processing'])
-    rows.append(['total_users_analyzed', results['total_users_analyzed'], 'processing'])
+    out.append(f"total_lines_processed,{results['total_lines_processed']},processing\r\n")
+    out.append(f"total_users_analyzed,{results['total_users_analyzed']},processing\r\n")
     
     # Base panel totals
     base_totals = results['aggregate_stats']['base_panel_usage']['total_activations_by_panel']
     for panel, count in base_totals.items():
-        rows.append([f'{panel}_total_activations', count, 'base_panels'])
+        out.append(f'{panel}_total_activations,{count},base_panels\r\n')
     
     # Employee panel statistics
     emp_stats = results['aggregate_stats']['employee_panel_usage']
     users_with_panels = sum(count for key, count in emp_stats['users_by_max_concurrent'].items() if key != '0_panels')
-    rows.append(['total_users_with_employee_panels', users_with_panels, 'employee_panels'])
+    out.append(f'total_users_with_employee_panels,{users_with_panels},employee_panels\r\n')
     
     # Switching behavior
     switching = results['aggregate_stats']['switching_behavior']
-    rows.append(['users_who_switched', switching['users_who_switched'], 'switching'])
-    rows.append(['switching_percentage', f"{switching['percentage_switched']:.2f}%", 'switching'])
+    out.append(f"users_who_switched,{switching['users_who_switched']},switching\r\n")
+    out.append(f"switching_percentage,{switching['percentage_switched']:.2f}%,switching\r\n")
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+        f.write(''.join(out))
 
 
 def print_summary_report(results: Dict):
     """Print a human-readable summary report."""
     stats = results['aggregate_stats']
+    base_usage = stats['base_panel_usage']
+    emp_usage = stats['employee_panel_usage']
+    switching = stats['switching_behavior']
     
     print("\n" + "="*80)
     print("PANEL SELECTION ANALYSIS REPORT")
@@ -425,11 +566,11 @@ def print_summary_report(results: Dict):
     
     # Base panel usage
     print(f"\n🏠 BASE PANEL USAGE")
-    base_usage = stats['base_panel_usage']
-    print(f"   Total activations across all base panels: {sum(base_usage['total_activations_by_panel'].values()):,}")
+    panels_by_activations = base_usage['panels_by_activations']
+    print(f"   Total activations across all base panels: {sum(count for _, count in panels_by_activations):,}")
     
     print(f"\n   Activations by panel:")
-    for panel, count in sorted(base_usage['total_activations_by_panel'].items(), key=lambda x: x[1], reverse=True):
+    for panel, count in panels_by_activations:
         print(f"     {panel:<12}: {count:,}")
     
     if base_usage['most_popular_base_panel']:
@@ -438,7 +579,6 @@ def print_summary_report(results: Dict):
     
     # Employee panel concurrent usage
     print(f"\n👥 EMPLOYEE PANEL CONCURRENT USAGE")
-    emp_usage = stats['employee_panel_usage']
     concurrent_dist = emp_usage['users_by_max_concurrent']
     
     print(f"   Users by maximum concurrent employee panels:")
@@ -450,7 +590,6 @@ def print_summary_report(results: Dict):
     
     # Switching behavior
     print(f"\n🔄 EMPLOYEE PANEL SWITCHING BEHAVIOR")
-    switching = stats['switching_behavior']
     print(f"   Users who switched between employee panels: {switching['users_who_switched']:,}")
     print(f"   Total users with employee panel activity: {switching['total_users']:,}")
     print(f"   Percentage who switched: {switching['percentage_switched']}%")
@@ -488,11 +627,16 @@ def main():
         return
     
     # Find all user log files
+    # scandir entries carry their file type, so no extra stat calls are needed;
+    # symlinks are not followed, as that would need a stat call per entry
     log_files = []
-    for date_dir in splits_dir.iterdir():
-        if date_dir.is_dir():
-            for log_file in date_dir.glob('*.log'):
-                log_files.append(log_file)
+    with os.scandir(splits_dir) as date_dirs:
+        for date_dir in date_dirs:
+            if date_dir.is_dir(follow_symlinks=False):
+                with os.scandir(date_dir.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.log') and entry.is_file(follow_symlinks=False):
+                            log_files.append(entry.path)
     
     if not log_files:
         logger.warning(f"No log files found in {splits_dir}")
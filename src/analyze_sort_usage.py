@@ -2,147 +2,244 @@
 # Usage: python src/analyze_sort_usage.py --input logs/splits --output out
 from __future__ import annotations
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 import re
 import polars as pl
-from datetime import datetime
 
-# Regex pattern for extracting sort information
-SORT_PATTERN = re.compile(
-    r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+).*'
-    r'\[User:\s*(?P<user>[A-Z0-9]+)\].*'
+try:
+    from .common_io import empty_event_columns, find_log_files, parse_date_and_hour, read_lines_containing
+except ImportError:
+    from common_io import empty_event_columns, find_log_files, parse_date_and_hour, read_lines_containing
+
+# Literal markers used to skip lines before any regex runs
+SORT_LITERAL = "Result grid sort changed"
+SORT_LITERAL_BYTES = SORT_LITERAL.encode()
+USER_LITERAL = "[User:"
+
+# Regex patterns for extracting sort information, each anchored at a known offset
+TIMESTAMP_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+')
+USER_PATTERN = re.compile(r'\[User:\s*(?P<user>[A-Z0-9]+)\]')
+SORT_TAIL_PATTERN = re.compile(
     r'Result grid sort changed\. new order:\s*\{[^}]*\}(?P<sort_field>\w+)\s+(?P<sort_direction>ASC|DESC)'
 )
 
-def find_log_files(input_dir: Path) -> list[Path]:
-    """Find all .log files in the input directory structure."""
-    return [p for p in input_dir.rglob("*.log") if p.is_file()]
+def match_sort_event(line: str) -> tuple[str, str, str, str] | None:
+    """
+    Match a sort event line as (timestamp, user, sort field, sort direction).
+    
+    Picks the same user tag and sort tail as a single pattern with greedy .*
+    between the parts would: the last sort tail, and the last user tag before it.
+    """
+    timestamp_match = TIMESTAMP_PATTERN.match(line)
+    if not timestamp_match:
+        return None
+    timestamp_end = timestamp_match.end()
+    
+    tail_start = line.rfind(SORT_LITERAL, timestamp_end)
+    while tail_start >= 0:
+        tail_match = SORT_TAIL_PATTERN.match(line, tail_start)
+        if tail_match:
+            break
+        tail_start = line.rfind(SORT_LITERAL, timestamp_end, tail_start)
+    else:
+        return None
+    
+    user_start = line.rfind(USER_LITERAL, timestamp_end, tail_start)
+    while user_start >= 0:
+        user_match = USER_PATTERN.match(line, user_start, tail_start)
+        if user_match:
+            return (
+                timestamp_match.group(), user_match.group("user"),
+                tail_match.group("sort_field"), tail_match.group("sort_direction")
+            )
+        user_start = line.rfind(USER_LITERAL, timestamp_end, user_start)
+    return None
+
+# Columns of the extracted sort events
+SORT_COLUMNS = ("date", "hour", "timestamp", "user_id", "sort_field", "sort_direction", "file_path")
 
-def extract_sort_events_from_file(log_file: Path) -> list[dict]:
-    """Extract sort events from a single log file."""
-    sort_events = []
+def extract_sort_events_from_file(log_file: Path) -> dict[str, list]:
+    """Extract sort events from a single log file as columns."""
+    columns = empty_event_columns(SORT_COLUMNS)
+    dates = columns["date"]
+    hours = columns["hour"]
+    timestamps = columns["timestamp"]
+    user_ids = columns["user_id"]
+    sort_fields = columns["sort_field"]
+    sort_directions = columns["sort_direction"]
+    file_paths = columns["file_path"]
+    file_path = str(log_file)
     
     try:
-        with log_file.open("r", encoding="utf-8", errors="ignore") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or "Result grid sort changed" not in line:
-                    continue
-                
-                match = SORT_PATTERN.match(line)
-                if match:
-                    timestamp_str = match.group("timestamp")
-                    user_id = match.group("user")
-                    sort_field = match.group("sort_field")
-                    sort_direction = match.group("sort_direction")
-                    
-                    # Parse timestamp for date extraction
-                    try:
-                        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
-                        date = dt.date().isoformat()
-                        hour = dt.hour
-                        
-                        sort_events.append({
-                            "date": date,
-                            "hour": hour,
-                            "timestamp": timestamp_str,
-                            "user_id": user_id,
-                            "sort_field": sort_field,
-                            "sort_direction": sort_direction,
-                            "sort_combination": f"{sort_field} {sort_direction}",
-                            "file_path": str(log_file)
-                        })
-                    except ValueError:
-                        # Skip lines with invalid timestamps
-                        continue
-                        
+        # Only the lines around each sort literal are cut out and decoded
+        sort_lines = read_lines_containing(log_file, SORT_LITERAL_BYTES)
+        
+        for line in sort_lines:
+            match = match_sort_event(line)
+            if not match:
+                continue
+            timestamp_str, user_id, sort_field, sort_direction = match
+            
+            # Parse timestamp for date extraction
+            try:
+                date, hour = parse_date_and_hour(timestamp_str)
+            except ValueError:
+                # Skip lines with invalid timestamps
+                continue
+            
+            dates.append(date)
+            hours.append(hour)
+            timestamps.append(timestamp_str)
+            user_ids.append(user_id)
+            sort_fields.append(sort_field)
+            sort_directions.append(sort_direction)
+            file_paths.append(file_path)
+    
     except Exception as e:
         print(f"Error processing file {log_file}: {e}")
     
-    return sort_events
+    return columns
+
+# Report file formats; CSV stays the default since the dashboard reads it
+REPORT_FORMATS = ("csv", "ipc", "parquet")
+
+# Report files and their column types, for writing empty reports when no data is
+# found; the types are those of a non-empty run, where counts use the index type
+_COUNT = pl.get_index_type()
+EMPTY_SORT_REPORTS = {
+    "sort_field_summary.csv": {
+        "sort_field": pl.Categorical, "total_uses": _COUNT, "unique_users": _COUNT, "days_used": _COUNT
+    },
+    "sort_direction_summary.csv": {
+        "sort_direction": pl.Categorical, "total_uses": _COUNT, "unique_users": _COUNT, "days_used": _COUNT
+    },
+    "sort_combination_summary.csv": {
+        "sort_combination": pl.Categorical, "total_uses": _COUNT, "unique_users": _COUNT, "days_used": _COUNT
+    },
+    "daily_sort_usage.csv": {
+        "date": pl.String, "total_sort_actions": _COUNT, "users_using_sort": _COUNT,
+        "different_fields_sorted": _COUNT, "different_combinations": _COUNT
+    },
+    "hourly_sort_usage.csv": {
+        "hour": pl.Int64, "total_sort_actions": _COUNT, "avg_users_sorting": _COUNT,
+        "different_fields_sorted": _COUNT
+    },
+    "user_sort_patterns.csv": {
+        "user_id": pl.Categorical, "total_sort_actions": _COUNT, "different_fields_used": _COUNT,
+        "different_combinations_used": _COUNT, "days_active_sorting": _COUNT,
+        "most_used_field": pl.Categorical, "preferred_direction": pl.Categorical
+    },
+}
+
+def sink_report(lf: pl.LazyFrame, output_file: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """
+    Build a lazy sink writing a report in the given format.
+    
+    output_file is the CSV path; IPC (.arrow, lz4) and Parquet (.parquet, zstd)
+    reports are written next to it with the suffix swapped.
+    """
+    if output_format == "ipc":
+        return lf.sink_ipc(output_file.with_suffix(".arrow"), compression="lz4", lazy=True)
+    if output_format == "parquet":
+        return lf.sink_parquet(output_file.with_suffix(".parquet"), compression="zstd", lazy=True)
+    return lf.sink_csv(output_file, lazy=True)
 
-def analyze_sort_usage(input_dir: Path, output_dir: Path) -> None:
+def analyze_sort_usage(input_dir: Path, output_dir: Path, output_format: str = "csv") -> None:
     """Analyze sort usage patterns and generate reports."""
     
     # Find all log files
     log_files = find_log_files(input_dir)
     print(f"Found {len(log_files)} log files to analyze for sort usage")
     
-    # Extract all sort events
-    all_sort_events = []
-    for i, log_file in enumerate(log_files, 1):
-        if i % 100 == 0:
-            print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
-        sort_events = extract_sort_events_from_file(log_file)
-        all_sort_events.extend(sort_events)
+    # Extract all sort events, scanning files in parallel; map keeps the file order
+    columns = empty_event_columns(SORT_COLUMNS)
+    with ProcessPoolExecutor() as executor:
+        for i, (log_file, file_columns) in enumerate(
+            zip(log_files, executor.map(extract_sort_events_from_file, log_files, chunksize=16)), 1
+        ):
+            if i % 100 == 0:
+                print(f"Processing file {i}/{len(log_files)}: {log_file.name}")
+            for name, values in file_columns.items():
+                columns[name].extend(values)
     
-    if not all_sort_events:
+    if not columns["date"]:
         print("No sort events found")
-        create_empty_sort_reports(output_dir)
+        create_empty_sort_reports(output_dir, output_format)
         return
     
-    # Create DataFrame
-    df = pl.DataFrame(all_sort_events)
-    print(f"Extracted {len(all_sort_events)} sort events")
+    # Create DataFrame, deriving the field+direction combination column from the other two
+    df = pl.DataFrame(columns).with_columns(
+        (pl.col("sort_field") + " " + pl.col("sort_direction")).alias("sort_combination")
+    )
+    # The grouped and uniquely counted string columns repeat a few values, so
+    # dictionary-encode them once; date stays a string as reports sort on it
+    df = df.with_columns(
+        pl.col("user_id", "sort_field", "sort_direction", "sort_combination").cast(pl.Categorical)
+    )
+    print(f"Extracted {df.height} sort events")
     
-    # Generate reports
-    generate_sort_field_summary(df, output_dir)
-    generate_sort_direction_summary(df, output_dir)
-    generate_sort_combination_summary(df, output_dir)
-    generate_daily_sort_usage(df, output_dir)
-    generate_hourly_sort_usage(df, output_dir)
-    generate_user_sort_patterns(df, output_dir)
+    # Generate reports, running all six queries over the shared frame in one pass
+    lf = df.lazy()
+    pl.collect_all([
+        generate_sort_field_summary(lf, output_dir, output_format),
+        generate_sort_direction_summary(lf, output_dir, output_format),
+        generate_sort_combination_summary(lf, output_dir, output_format),
+        generate_daily_sort_usage(lf, output_dir, output_format),
+        generate_hourly_sort_usage(lf, output_dir, output_format),
+        generate_user_sort_patterns(lf, output_dir, output_format)
+    ])
     
     print(f"Sort usage reports generated in {output_dir}")
 
-def generate_sort_field_summary(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate summary of which fields are sorted most often."""
+def generate_sort_field_summary(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate summary of which fields are sorted most often, as a lazy report sink."""
     sort_field_stats = (
-        df.group_by("sort_field")
+        lf.group_by("sort_field")
         .agg([
-            pl.count("sort_field").alias("total_uses"),
+            pl.len().alias("total_uses"),
             pl.n_unique("user_id").alias("unique_users"),
             pl.n_unique("date").alias("days_used")
         ])
         .sort("total_uses", descending=True)
     )
     
-    sort_field_stats.write_csv(output_dir / "sort_field_summary.csv")
+    return sink_report(sort_field_stats, output_dir / "sort_field_summary.csv", output_format)
 
-def generate_sort_direction_summary(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate summary of ASC vs DESC usage."""
+def generate_sort_direction_summary(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate summary of ASC vs DESC usage, as a lazy report sink."""
     direction_stats = (
-        df.group_by("sort_direction")
+        lf.group_by("sort_direction")
         .agg([
-            pl.count("sort_direction").alias("total_uses"),
+            pl.len().alias("total_uses"),
             pl.n_unique("user_id").alias("unique_users"),
             pl.n_unique("date").alias("days_used")
         ])
         .sort("total_uses", descending=True)
     )
     
-    direction_stats.write_csv(output_dir / "sort_direction_summary.csv")
+    return sink_report(direction_stats, output_dir / "sort_direction_summary.csv", output_format)
 
-def generate_sort_combination_summary(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate summary of field+direction combinations."""
+def generate_sort_combination_summary(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate summary of field+direction combinations, as a lazy report sink."""
     combination_stats = (
-        df.group_by("sort_combination")
+        lf.group_by("sort_combination")
         .agg([
-            pl.count("sort_combination").alias("total_uses"),
+            pl.len().alias("total_uses"),
             pl.n_unique("user_id").alias("unique_users"),
             pl.n_unique("date").alias("days_used")
         ])
         .sort("total_uses", descending=True)
     )
     
-    combination_stats.write_csv(output_dir / "sort_combination_summary.csv")
+    return sink_report(combination_stats, output_dir / "sort_combination_summary.csv", output_format)
 
-def generate_daily_sort_usage(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate daily sort usage statistics."""
+def generate_daily_sort_usage(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate daily sort usage statistics, as a lazy report sink."""
     daily_stats = (
-        df.group_by("date")
+        lf.group_by("date")
         .agg([
-            pl.count("sort_field").alias("total_sort_actions"),
+            pl.len().alias("total_sort_actions"),
             pl.n_unique("user_id").alias("users_using_sort"),
             pl.n_unique("sort_field").alias("different_fields_sorted"),
             pl.n_unique("sort_combination").alias("different_combinations")
@@ -150,79 +247,71 @@ def generate_daily_sort_usage(df: pl.DataFrame, output_dir: Path) -> None:
         .sort("date")
     )
     
-    daily_stats.write_csv(output_dir / "daily_sort_usage.csv")
+    return sink_report(daily_stats, output_dir / "daily_sort_usage.csv", output_format)
 
-def generate_hourly_sort_usage(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate hourly sort usage patterns."""
+def generate_hourly_sort_usage(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate hourly sort usage patterns, as a lazy report sink."""
     hourly_stats = (
-        df.group_by("hour")
+        lf.group_by("hour")
         .agg([
-            pl.count("sort_field").alias("total_sort_actions"),
+            pl.len().alias("total_sort_actions"),
             pl.n_unique("user_id").alias("avg_users_sorting"),
             pl.n_unique("sort_field").alias("different_fields_sorted")
         ])
         .sort("hour")
     )
     
-    hourly_stats.write_csv(output_dir / "hourly_sort_usage.csv")
+    return sink_report(hourly_stats, output_dir / "hourly_sort_usage.csv", output_format)
+
+def most_used_per_user(lf: pl.LazyFrame, column: str, alias: str) -> pl.LazyFrame:
+    """Find each user's most frequent value of a column from hashed (user, value) counts.
+
+    This avoids sorting every user's values, which a per-group mode() does.
+    """
+    return (
+        lf.group_by("user_id", column)
+        .agg(pl.len().alias("uses"))
+        .group_by("user_id")
+        .agg(pl.col(column).sort_by("uses", descending=True).first().alias(alias))
+    )
 
-def generate_user_sort_patterns(df: pl.DataFrame, output_dir: Path) -> None:
-    """Generate per-user sort behavior analysis."""
+def generate_user_sort_patterns(lf: pl.LazyFrame, output_dir: Path, output_format: str = "csv") -> pl.LazyFrame:
+    """Generate per-user sort behavior analysis, as a lazy report sink."""
     user_stats = (
-        df.group_by("user_id")
+        lf.group_by("user_id")
         .agg([
-            pl.count("sort_field").alias("total_sort_actions"),
+            pl.len().alias("total_sort_actions"),
             pl.n_unique("sort_field").alias("different_fields_used"),
             pl.n_unique("sort_combination").alias("different_combinations_used"),
-            pl.n_unique("date").alias("days_active_sorting"),
-            pl.col("sort_field").mode().first().alias("most_used_field"),
-            pl.col("sort_direction").mode().first().alias("preferred_direction")
+            pl.n_unique("date").alias("days_active_sorting")
         ])
+        .join(most_used_per_user(lf, "sort_field", "most_used_field"), on="user_id")
+        .join(most_used_per_user(lf, "sort_direction", "preferred_direction"), on="user_id")
         .sort("total_sort_actions", descending=True)
     )
     
-    user_stats.write_csv(output_dir / "user_sort_patterns.csv")
+    return sink_report(user_stats, output_dir / "user_sort_patterns.csv", output_format)
 
-def create_empty_sort_reports(output_dir: Path) -> None:
-    """Create empty CSV files with proper headers when no data is found."""
+def create_empty_sort_reports(output_dir: Path, output_format: str = "csv") -> None:
+    """Create empty report files with proper headers when no data is found."""
     
-    # Empty sort field summary
-    pl.DataFrame({
-        "sort_field": [], "total_uses": [], "unique_users": [], "days_used": []
-    }).write_csv(output_dir / "sort_field_summary.csv")
-    
-    # Empty sort direction summary
-    pl.DataFrame({
-        "sort_direction": [], "total_uses": [], "unique_users": [], "days_used": []
-    }).write_csv(output_dir / "sort_direction_summary.csv")
-    
-    # Empty sort combination summary
-    pl.DataFrame({
-        "sort_combination": [], "total_uses": [], "unique_users": [], "days_used": []
-    }).write_csv(output_dir / "sort_combination_summary.csv")
-    
-    # Empty daily usage
-    pl.DataFrame({
-        "date": [], "total_sort_actions": [], "users_using_sort": [], 
-        "different_fields_sorted": [], "different_combinations": []
-    }).write_csv(output_dir / "daily_sort_usage.csv")
-    
-    # Empty hourly usage
-    pl.DataFrame({
-        "hour": [], "total_sort_actions": [], "avg_users_sorting": [], "different_fields_sorted": []
-    }).write_csv(output_dir / "hourly_sort_usage.csv")
+    if output_format == "csv":
+        # A header-only CSV needs no frame or writer; written as bytes so it gets
+        # UTF-8 and a \n line ending on every platform, like Polars' CSV writer
+        for file_name, columns in EMPTY_SORT_REPORTS.items():
+            (output_dir / file_name).write_bytes((",".join(columns) + "\n").encode("utf-8"))
+        return
     
-    # Empty user patterns
-    pl.DataFrame({
-        "user_id": [], "total_sort_actions": [], "different_fields_used": [],
-        "different_combinations_used": [], "days_active_sorting": [],
-        "most_used_field": [], "preferred_direction": []
-    }).write_csv(output_dir / "user_sort_patterns.csv")
+    pl.collect_all([
+        sink_report(pl.LazyFrame(schema=schema), output_dir / file_name, output_format)
+        for file_name, schema in EMPTY_SORT_REPORTS.items()
+    ])
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Analyze sort functionality usage from split log files")
     parser.add_argument("--input", default="logs/splits", help="Input directory with split log files")
     parser.add_argument("--output", default="out", help="Output directory for CSV reports")
+    parser.add_argument("--format", default="csv", choices=REPORT_FORMATS, help="Report file format (default: csv)")
     
     args = parser.parse_args()
     
@@ -235,7 +324,7 @@ def main() -> None:
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    analyze_sort_usage(input_dir, output_dir)
+    analyze_sort_usage(input_dir, output_dir, args.format)
 
 if __name__ == "__main__":
     main()
@@ -2,51 +2,86 @@
 # Usage: python src/analyze_user_agents.py --input logs/splits --output out
 from __future__ import annotations
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import functools
 import re
 import polars as pl
 from user_agents import parse as ua_parse
 
 RE_UA = re.compile(r"\[UserAgent:\s*(?P<ua>.+?)\]")
+# The first line ends at \n, \r\n or a lone \r, as in text mode
+RE_LINE_END = re.compile(rb"[\r\n]")
 
 def find_log_files(input_dir: Path) -> list[Path]:
     return [p for p in input_dir.rglob("*.log") if p.is_file()]
 
+@functools.lru_cache(maxsize=4096)
+def describe_user_agent(raw: str) -> tuple:
+    """
+    Parse a user agent string into (browser, os, device, is_mobile, is_tablet,
+    is_touch_capable, is_pc, is_bot).
+    
+    Every user sends the same string in each daily file, so results are cached;
+    only the small tuple is kept, not the parsed UserAgent object.
+    """
+    ua = ua_parse(raw)
+    # Normaliseer een paar namen
+    browser_family = ua.browser.family or ""
+    if browser_family == "Edg":
+        browser_family = "Microsoft Edge"
+
+    # Fix Windows 11 detection issue - Windows 11 also reports as NT 10.0
+    os_string = f"{ua.os.family or ''} {ua.os.version_string or ''}".strip()
+    if os_string == "Windows 10":
+        os_string = "Windows 10/11"
+    
+    return (
+        f"{browser_family} {ua.browser.version_string or ''}".strip(),
+        os_string,
+        (ua.device.family or "Unknown"),
+        ua.is_mobile,
+        ua.is_tablet,
+        ua.is_touch_capable,
+        ua.is_pc,
+        ua.is_bot
+    )
+
+def read_first_line(p: Path) -> str:
+    """Read the first line of a file in binary mode, decoding only that line."""
+    with open(p, "rb") as f:
+        line = f.readline()
+    # readline only stops at \n, so cut at an earlier \r as well
+    line_end = RE_LINE_END.search(line)
+    if line_end:
+        line = line[:line_end.start()]
+    return line.decode("utf-8", errors="ignore")
+
 def parse_first_line_ua(p: Path) -> dict | None:
     try:
-        with p.open("r", encoding="utf-8", errors="ignore") as f:
-            line = f.readline().strip()
+        line = read_first_line(p).strip()
         if not line:
             return None
         m = RE_UA.search(line)
         if not m:
             return None
         raw = m.group("ua")
-        ua = ua_parse(raw)
+        browser, os_string, device, is_mobile, is_tablet, is_touch_capable, is_pc, is_bot = describe_user_agent(raw)
         date = p.parent.name           # YYYY-MM-DD (mapnaam)
         user_id = p.stem               # bestandsnaam zonder .log
-        # Normaliseer een paar namen
-        browser_family = ua.browser.family or ""
-        if browser_family == "Edg":
-            browser_family = "Microsoft Edge"
-
-        # Fix Windows 11 detection issue - Windows 11 also reports as NT 10.0
-        os_string = f"{ua.os.family or ''} {ua.os.version_string or ''}".strip()
-        if os_string == "Windows 10":
-            os_string = "Windows 10/11"
         
         return {
             "date": date,
             "user_id": user_id,
             "raw_user_agent": raw,
-            "browser": f"{browser_family} {ua.browser.version_string or ''}".strip(),
+            "browser": browser,
             "os": os_string,
-            "device": (ua.device.family or "Unknown"),
-            "is_mobile": ua.is_mobile,
-            "is_tablet": ua.is_tablet,
-            "is_touch_capable": ua.is_touch_capable,
-            "is_pc": ua.is_pc,
-            "is_bot": ua.is_bot
+            "device": device,
+            "is_mobile": is_mobile,
+            "is_tablet": is_tablet,
+            "is_touch_capable": is_touch_capable,
+            "is_pc": is_pc,
+            "is_bot": is_bot
         }
     except Exception:
         return None
@@ -61,12 +96,10 @@ def main() -> None:
     out = Path(args.output)
     out.mkdir(parents=True, exist_ok=True)
 
-    rows = []
+    # Parse the files in parallel; map keeps the file order, so keep="first" below is unchanged
     files = find_log_files(inp)
-    for p in files:
-        rec = parse_first_line_ua(p)
-        if rec:
-            rows.append(rec)
+    with ProcessPoolExecutor() as executor:
+        rows = [rec for rec in executor.map(parse_first_line_ua, files, chunksize=64) if rec]
 
     if rows:
         df = pl.DataFrame(rows)
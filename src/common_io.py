@@ -0,0 +1,121 @@
+# src/common_io.py
+# Shared log discovery helpers for the analyze_* scripts.
+from __future__ import annotations
+from pathlib import Path
+from array import array
+import functools
+import mmap
+import os
+import re
+import polars as pl
+from datetime import datetime
+
+def _iter_log_paths(root: str):
+    """Yield the paths of all .log files below root, using scandir's cached entry types."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".log") and entry.is_file():
+                    yield entry.path
+
+def find_log_files(input_dir: Path) -> list[Path]:
+    """Find all .log files in the input directory structure, in sorted order."""
+    return sorted(Path(p) for p in _iter_log_paths(str(input_dir)))
+
+# Timestamps of the usual shape, whose minutes, seconds and fraction strptime would accept
+TIMESTAMP_SHAPE = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-5][0-9]:[0-5][0-9]\.[0-9]{1,6}"
+)
+
+@functools.lru_cache(maxsize=None)
+def _date_and_hour(date_hour: str) -> tuple[str, int]:
+    dt = datetime.strptime(date_hour, "%Y-%m-%d %H")
+    return dt.date().isoformat(), dt.hour
+
+def parse_date_and_hour(timestamp_str: str) -> tuple[str, int]:
+    """Get the ISO date and hour of a log timestamp, raising ValueError for the same
+    timestamps datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f") rejects.
+
+    For timestamps of the usual shape only the date and hour prefix goes through
+    strptime, cached, since it repeats across a file; anything else is parsed in full.
+    """
+    if TIMESTAMP_SHAPE.fullmatch(timestamp_str):
+        return _date_and_hour(timestamp_str[:13])
+    dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
+    return dt.date().isoformat(), dt.hour
+
+def empty_event_columns(names: tuple[str, ...]) -> dict:
+    """Create an empty event column table, with the hour column as a byte array.
+
+    Events are collected as columns rather than a dict per event, which keeps
+    them small in memory and when pickled between processes.
+    """
+    columns = {name: [] for name in names}
+    columns["hour"] = array("B")
+    return columns
+
+# Comparison operators a filter value can start with, longest first
+COMPARISON_OPERATORS = (">=", "<=", ">", "<", "=")
+
+def comparison_operator(filter_value: str) -> str | None:
+    """Get the comparison operator a filter value starts with, if any."""
+    for operator in COMPARISON_OPERATORS:
+        if filter_value.startswith(operator):
+            return operator
+    return None
+
+# Files up to this size are read with one call; larger ones are memory-mapped
+SMALL_FILE_SIZE = 1 << 20
+
+def lines_containing(data, literal: bytes) -> list[str]:
+    """Cut out, decode and strip the lines of a bytes-like buffer that contain a literal."""
+    lines = []
+    size = len(data)
+    literal_pos = data.find(literal)
+    while literal_pos >= 0:
+        # Lines end at \n, \r\n or a lone \r, as in text mode
+        line_start = data.rfind(b"\n", 0, literal_pos) + 1
+        line_start = data.rfind(b"\r", line_start, literal_pos) + 1 or line_start
+        line_end = data.find(b"\n", literal_pos)
+        if line_end < 0:
+            line_end = size
+        carriage_return = data.find(b"\r", literal_pos, line_end)
+        if carriage_return >= 0:
+            line_end = carriage_return
+        literal_pos = data.find(literal, line_end)
+
+        lines.append(data[line_start:line_end].decode("utf-8", errors="ignore").strip())
+    return lines
+
+def read_lines_containing(log_file: Path, literal: bytes) -> list[str]:
+    """Read the lines of a log file that contain a literal, decoded and stripped.
+
+    Only the lines around each occurrence are decoded, so files without the
+    literal cost a single search.
+    """
+    with open(log_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= SMALL_FILE_SIZE:
+            return lines_containing(f.read(), literal)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return lines_containing(mm, literal)
+
+@functools.lru_cache(maxsize=8)
+def _count_unique_users_cached(user_agents_path: Path, mtime_ns: int) -> int:
+    try:
+        df = pl.read_csv(user_agents_path)
+        return df["user_id"].n_unique()
+    except Exception:
+        return 0
+
+def get_total_unique_users(output_dir: Path) -> int:
+    """Get total number of unique users from user agents data."""
+    user_agents_path = output_dir / "user_agents.csv"
+    if user_agents_path.exists():
+        return _count_unique_users_cached(user_agents_path, user_agents_path.stat().st_mtime_ns)
+    return 0
@@ -0,0 +1,109 @@
+# src/scan_logs.py
+# Usage: python src/scan_logs.py --input logs/splits --output out
+#
+# Runs the folder selection and employee filter analyses from a single pass
+# over the split log files instead of reading every file once per analysis.
+from __future__ import annotations
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import polars as pl
+
+try:
+    from .common_io import empty_event_columns, find_log_files, lines_containing
+    from .analyze_folder_selection import (
+        FOLDER_LITERAL, FOLDER_COLUMNS, append_folder_event, generate_folder_reports,
+        create_empty_folder_reports
+    )
+    from .analyze_employee_filter import (
+        EMPLOYEE_FILTER_LITERAL, FILTER_COLUMNS, append_employee_filter_events,
+        generate_filter_reports, create_empty_filter_reports
+    )
+except ImportError:
+    from common_io import empty_event_columns, find_log_files, lines_containing
+    from analyze_folder_selection import (
+        FOLDER_LITERAL, FOLDER_COLUMNS, append_folder_event, generate_folder_reports,
+        create_empty_folder_reports
+    )
+    from analyze_employee_filter import (
+        EMPLOYEE_FILTER_LITERAL, FILTER_COLUMNS, append_employee_filter_events,
+        generate_filter_reports, create_empty_filter_reports
+    )
+
+def scan_file(log_file: Path) -> tuple[dict, dict]:
+    """Extract folder selection and employee filter events from a single log file as columns.
+
+    The file is read once; each analysis then cuts its own lines out of the same
+    buffer and parses them with the per-line builder of its module.
+    """
+    folder = empty_event_columns(FOLDER_COLUMNS)
+    filters = empty_event_columns(FILTER_COLUMNS)
+
+    try:
+        data = log_file.read_bytes()
+        file_path = str(log_file)
+        for line in lines_containing(data, FOLDER_LITERAL):
+            append_folder_event(folder, line, file_path)
+        for line in lines_containing(data, EMPLOYEE_FILTER_LITERAL):
+            append_employee_filter_events(filters, line, file_path)
+
+    except Exception as e:
+        print(f"Error processing file {log_file}: {e}")
+
+    return folder, filters
+
+def scan_logs(log_files: list[Path]) -> tuple[dict, dict]:
+    """Scan all log files in parallel and collect folder and employee filter event columns."""
+    all_folder = {name: [] for name in FOLDER_COLUMNS}
+    all_filters = {name: [] for name in FILTER_COLUMNS}
+
+    with ProcessPoolExecutor() as executor:
+        for i, (folder, filters) in enumerate(
+            executor.map(scan_file, log_files, chunksize=16), 1
+        ):
+            if i % 100 == 0:
+                print(f"Processed file {i}/{len(log_files)}")
+            for name, values in folder.items():
+                all_folder[name].extend(values)
+            for name, values in filters.items():
+                all_filters[name].extend(values)
+
+    return all_folder, all_filters
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyze folder selection and employee filter usage in one pass")
+    parser.add_argument("--input", default="logs/splits", help="Input directory with split log files")
+    parser.add_argument("--output", default="out", help="Output directory for CSV reports")
+
+    args = parser.parse_args()
+
+    input_dir = Path(args.input)
+    output_dir = Path(args.output)
+
+    if not input_dir.exists():
+        print(f"Input directory does not exist: {input_dir}")
+        return
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    log_files = find_log_files(input_dir)
+    print(f"Found {len(log_files)} log files to scan")
+
+    folder, filters = scan_logs(log_files)
+
+    if folder["date"]:
+        print(f"Extracted {len(folder['date'])} folder selection events")
+        generate_folder_reports(pl.DataFrame(folder), output_dir)
+    else:
+        print("No folder selection events found")
+        create_empty_folder_reports(output_dir)
+
+    if filters["date"]:
+        print(f"Extracted {len(filters['date'])} employee filter events")
+        generate_filter_reports(pl.DataFrame(filters), output_dir)
+    else:
+        print("No employee filter events found")
+        create_empty_filter_reports(output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ Log splitter for personnel file portal logs.
 Splits daily logs by user into separate files.
 Supports both .log and .arc file formats.
 """
+import os
 import re
+import mmap
 import logging
 import shutil
 from pathlib import Path
@@ -13,12 +15,73 @@ from typing import Optional
 # Regex patterns for parsing log lines
 DATE_PATTERN = re.compile(r'^(?P<date>\d{4}-\d{2}-\d{2})\s+\d{2}:\d{2}:\d{2}\.\d+')
 USER_PATTERN = re.compile(r'\[User:\s*(?P<user>[A-Z0-9]+)\]')
+# Both in one match, for the common line that starts with a date and has a user
+DATED_USER_PATTERN = re.compile(
+    r'^(?P<date>\d{4}-\d{2}-\d{2})\s+\d{2}:\d{2}:\d{2}\.\d+.*?\[User:\s*(?P<user>[A-Z0-9]+)\]'
+)
+USER_LITERAL = '[User:'
+
+# The same patterns for ASCII lines as bytes; [\s\x1c-\x1f] matches what \s matches in ASCII text
+DATE_BYTES_PATTERN = re.compile(rb'^(?P<date>\d{4}-\d{2}-\d{2})[\s\x1c-\x1f]+\d{2}:\d{2}:\d{2}\.\d+')
+USER_BYTES_PATTERN = re.compile(rb'\[User:[\s\x1c-\x1f]*(?P<user>[A-Z0-9]+)\]')
+DATED_USER_BYTES_PATTERN = re.compile(
+    rb'^(?P<date>\d{4}-\d{2}-\d{2})[\s\x1c-\x1f]+\d{2}:\d{2}:\d{2}\.\d+.*?\[User:[\s\x1c-\x1f]*(?P<user>[A-Z0-9]+)\]'
+)
+USER_BYTES_LITERAL = b'[User:'
+
+# Line breaks as text mode reads them: \n, \r\n or a lone \r
+LINE_BREAK_PATTERN = re.compile(r'\r\n|\r|\n')
+LINE_BREAK_BYTES_PATTERN = re.compile(rb'\r\n|\r|\n')
+
+# Input files are split into lines in windows of this size
+WINDOW_SIZE = 1 << 20
+
+# Split files kept open while splitting one input file, and their write buffer size
+MAX_OPEN_WRITERS = 256
+WRITER_BUFFER_SIZE = 1 << 16
+
+# Split lines end in the platform line separator, as text-mode writes of '\n' did
+LINE_SEPARATOR = os.linesep.encode('ascii')
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def iter_line_windows(in_path: Path):
+    """
+    Memory-map a log file and yield its lines in windows of about WINDOW_SIZE bytes.
+    
+    Yields:
+        Tuple of (lines, is_text). ASCII windows are yielded as bytes lines; other
+        windows are decoded as UTF-8, ignoring invalid bytes, and yielded as str lines.
+    """
+    with open(in_path, 'rb') as infile:
+        size = os.fstat(infile.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            start = 0
+            while start < size:
+                # Windows end on a \n, so a \r\n pair is never split between two windows
+                end = mm.rfind(b'\n', start, start + WINDOW_SIZE) + 1
+                if not end:
+                    end = mm.find(b'\n', start) + 1 or size
+                window = mm[start:end]
+                start = end
+                
+                if window.isascii():
+                    lines, is_text = LINE_BREAK_BYTES_PATTERN.split(window), False
+                else:
+                    lines, is_text = LINE_BREAK_PATTERN.split(window.decode('utf-8', errors='ignore')), True
+                # Drop the empty piece after the final line break
+                if not lines[-1]:
+                    lines.pop()
+                yield lines, is_text
+
+
 def split_one_file(in_path: Path) -> int:
     """
     Split a single log file by date and user.
@@ -35,32 +98,51 @@ def split_one_file(in_path: Path) -> int:
     
     lines_processed = 0
     current_date = None
+    writers = {}  # Open split file for each (date, user), oldest opened first
+    created_dirs = {}  # Output directory for each date already created
     
     logger.info(f"Processing file: {in_path}")
     
     try:
-        with open(in_path, 'r', encoding='utf-8', errors='ignore') as infile:
-            for line in infile:
-                line = line.rstrip('\n\r')
-                
-                # Extract date from line
-                date_match = DATE_PATTERN.match(line)
+        for lines, is_text in iter_line_windows(in_path):
+            if is_text:
+                match_dated_user, match_date = DATED_USER_PATTERN.match, DATE_PATTERN.match
+                search_user, user_literal = USER_PATTERN.search, USER_LITERAL
+            else:
+                match_dated_user, match_date = DATED_USER_BYTES_PATTERN.match, DATE_BYTES_PATTERN.match
+                search_user, user_literal = USER_BYTES_PATTERN.search, USER_BYTES_LITERAL
+            
+            for line in lines:
+                # Extract date and user from line. A user tag can only follow the
+                # timestamp, so a dated line the combined pattern misses has no user.
+                user_match = match_dated_user(line)
+                date_match = user_match or match_date(line)
                 if date_match:
                     current_date = date_match.group('date')
+                    if not is_text:
+                        current_date = current_date.decode('ascii')
+                elif user_literal in line:
+                    user_match = search_user(line)
                 
-                # Extract user from line
-                user_match = USER_PATTERN.search(line)
                 if user_match and current_date:
                     user = user_match.group('user')
+                    if not is_text:
+                        user = user.decode('ascii')
                     
-                    # Create output directory for this date
-                    output_dir = Path('logs/splits') / current_date
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # Append line to user's file for this date
-                    output_file = output_dir / f"{user}.log"
-                    with open(output_file, 'a', encoding='utf-8') as outfile:
-                        outfile.write(line + '\n')
+                    # Append line to user's file for this date, opening it on first use
+                    outfile = writers.get((current_date, user))
+                    if outfile is None:
+                        if len(writers) >= MAX_OPEN_WRITERS:
+                            writers.pop(next(iter(writers))).close()
+                        output_dir = created_dirs.get(current_date)
+                        if output_dir is None:
+                            output_dir = os.path.join('logs', 'splits', current_date)
+                            os.makedirs(output_dir, exist_ok=True)
+                            created_dirs[current_date] = output_dir
+                        outfile = open(os.path.join(output_dir, f"{user}.log"), 'ab', buffering=WRITER_BUFFER_SIZE)
+                        writers[(current_date, user)] = outfile
+                    outfile.write(line.encode('utf-8') if is_text else line)
+                    outfile.write(LINE_SEPARATOR)
                 
                 lines_processed += 1
                 
@@ -72,6 +154,10 @@ def split_one_file(in_path: Path) -> int:
         logger.error(f"Error processing file {in_path}: {e}")
         raise
     
+    finally:
+        for outfile in writers.values():
+            outfile.close()
+    
     logger.info(f"Completed processing {in_path}: {lines_processed} lines")
     return lines_processed
 
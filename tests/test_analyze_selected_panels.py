@@ -96,6 +96,20 @@ class TestSelectedPanelsAnalysis:
         assert summary['max_concurrent_employee_panels'] == 3  # Before DEF456 was removed
         assert summary['employee_panel_switches'] == 4
     
+    def test_panel_tracker_concurrent_limit(self):
+        """Test that the oldest employee panel is dropped beyond the concurrent limit."""
+        tracker = PanelTracker("USER004")
+        
+        for panel in ["EMP001", "EMP002", "EMP003", "EMP004", "EMP005", "EMP006"]:
+            tracker.process_panel_added(panel)
+        
+        assert list(tracker.current_employee_panels) == ["EMP002", "EMP003", "EMP004", "EMP005", "EMP006"]
+        
+        summary = tracker.get_summary()
+        
+        assert summary['unique_employee_panels_opened'] == 6
+        assert summary['max_concurrent_employee_panels'] == 5
+    
     def test_analyze_panel_usage_integration(self):
         """Test the full analysis pipeline with sample data."""
         # Create sample log content
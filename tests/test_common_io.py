@@ -0,0 +1,29 @@
+# tests/test_common_io.py
+import pytest
+from datetime import datetime
+from src.common_io import parse_date_and_hour
+
+@pytest.mark.parametrize("timestamp_str", [
+    "2025-01-09 15:30:45.123",
+    "2025-01-09 15:30:45.123456",
+    "2025-01-09 15:30:45.1234567",
+    "2025-01-09T15:30:45.123",
+    "2025-01-09 15-30:45.123",
+    "2025-01-09 15:30-45.123",
+    "2025-01-09 15:30:45x123",
+    "2025-01-09 15:30:45.12a",
+    "2025-01-09 15:60:45.123",
+    "2025-01-09 15:30:61.123",
+    "2025-02-30 15:30:45.123",
+    "2025-1-09 15:30:45.123",
+])
+def test_parse_date_and_hour_matches_strptime(timestamp_str):
+    """Test that timestamps are accepted and rejected exactly as the full strptime format does."""
+    
+    try:
+        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S.%f")
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_date_and_hour(timestamp_str)
+        return
+    assert parse_date_and_hour(timestamp_str) == (dt.date().isoformat(), dt.hour)
@@ -0,0 +1,74 @@
+# tests/test_misc_functions.py
+import polars as pl
+from pathlib import Path
+from src.analyze_misc_functions import analyze_misc_functions
+
+def test_events_counted_once_per_line(tmp_path):
+    """Test that every event kind is counted once per log line, even with two hits on the line."""
+    
+    logs_dir = tmp_path / "logs" / "2025-01-09"
+    logs_dir.mkdir(parents=True)
+    (logs_dir / "U1.log").write_text(
+        "2025-01-09 15:30:45.123 [User: U1] Assign 2 documents to employee; Assign 3 documents to employee\n"
+        "2025-01-09 15:31:45.123 [User: U1] View Page: Viewing document. Mimetype:pdf. "
+        "View Page: Viewing document. Mimetype:pdf.\n"
+        "2025-01-09 15:32:45.123 [User: U1] Excel export: ResultType='rs', ResultsView='v', "
+        "FileName='a.xlsx', FileSize=10 Excel export: ResultType='rs', ResultsView='v', "
+        "FileName='b.xlsx', FileSize=20\n"
+        "2025-01-09 15:33:45.123 [User: U1] View Page: Switched to other document. Position:1 "
+        "View Page: Switched to other document. Position:2\n"
+        "2025-01-09 15:34:45.123 [User: U1] Assign 4 documents to employee\n"
+    )
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    
+    analyze_misc_functions(tmp_path / "logs", output_dir)
+    
+    functions = pl.read_csv(output_dir / "misc_functions.csv")
+    assert functions["total_usage"].to_list() == [2]
+    assert functions["total_documents"].to_list() == [6]
+    assert pl.read_csv(output_dir / "document_views.csv")["total_views"].to_list() == [1]
+    assert pl.read_csv(output_dir / "excel_exports.csv")["total_exports"].to_list() == [1, 1]
+    assert pl.read_csv(output_dir / "view_page_switches.csv")["total_switches"].to_list() == [1]
+
+def test_events_inside_other_events_are_counted(tmp_path):
+    """Test that event text inside another event's match is counted, as with one search per pattern."""
+    
+    logs_dir = tmp_path / "logs" / "2025-01-09"
+    logs_dir.mkdir(parents=True)
+    (logs_dir / "U1.log").write_text(
+        "2025-01-09 15:32:45.123 [User: U1] Excel export: ResultType='rs', ResultsView='v', "
+        "FileName='Copy 2 documents to employee.xlsx', FileSize=10\n"
+    )
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    
+    analyze_misc_functions(tmp_path / "logs", output_dir)
+    
+    functions = pl.read_csv(output_dir / "misc_functions.csv")
+    assert functions["function_name"].to_list() == ["Copy document(s) to employee"]
+    assert functions["total_usage"].to_list() == [1]
+    assert pl.read_csv(output_dir / "excel_exports.csv")["total_exports"].to_list() == [1, 1]
+
+def test_lone_carriage_returns_end_lines(tmp_path):
+    """Test that a lone \\r ends a log line, as in text mode, so records on either side stay apart."""
+    
+    logs_dir = tmp_path / "logs" / "raw"
+    logs_dir.mkdir(parents=True)
+    (logs_dir / "portal.log").write_bytes(
+        b"2025-01-09 15:30:45.123 [User: U1] Open Employee Dossier called\r"
+        b"2025-01-09 15:31:45.123 [User: U2] Open Employee Dossier called\r"
+        b"2025-01-09 15:32:45.123 [User: U3] Assign 2 documents to employee\r\n"
+        b"2025-01-09 15:33:45.123 [User: U4] Assign 3 documents to employee\n"
+    )
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    
+    analyze_misc_functions(tmp_path / "logs", output_dir)
+    
+    functions = pl.read_csv(output_dir / "misc_functions.csv")
+    assert functions["function_name"].to_list() == [
+        "Open Employee Dossier from a document", "Assign document(s) to an employee"
+    ]
+    assert functions["total_usage"].to_list() == [2, 2]
+    assert functions["unique_users"].to_list() == [2, 2]
@@ -0,0 +1,24 @@
+# tests/test_scan_logs.py
+from pathlib import Path
+from src.scan_logs import scan_file
+from src.analyze_folder_selection import extract_folder_events_columnar
+from src.analyze_employee_filter import extract_employee_filter_events_columnar
+
+def test_scan_file_matches_per_analysis_extraction(tmp_path):
+    """Test that the single-pass scan extracts the same events as the separate analyses."""
+    
+    log_file = tmp_path / "U1.log"
+    log_file.write_bytes(
+        b"2025-01-09 15:30:45.123 [User: U1] FolderSelected: 02. Verlof\r\n"
+        b"   2025-01-09 15:31:45.123 [User: U1] FolderSelected: 03. Personeels dossier\r\n"
+        b"2025-01-09 15:32:45.123 [User: U1] Employee filter executed with criteria: "
+        b"Entries:{ns}LastName='Jansen'{ns}Age='>30'\r\n"
+        b"2025-01-09 15:33:45.123 [User: U1] Some other action.\r\n"
+    )
+    
+    folder, filters = scan_file(log_file)
+    
+    assert folder == extract_folder_events_columnar(log_file)
+    assert filters == extract_employee_filter_events_columnar(log_file)
+    assert folder["folder_name"] == ["02. Verlof", "03. Personeels dossier"]
+    assert filters["filter_value"] == ["Jansen", ">30"]
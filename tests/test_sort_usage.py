@@ -0,0 +1,61 @@
+# tests/test_sort_usage.py
+import pytest
+import polars as pl
+from pathlib import Path
+from src.analyze_sort_usage import EMPTY_SORT_REPORTS, analyze_sort_usage, create_empty_sort_reports
+
+SORT_LOG = (
+    "2025-01-09 15:30:45.123 [User: U1] Result grid sort changed. new order: {ns}LastName ASC\n"
+    "2025-01-09 16:30:45.123 [User: U1] Result grid sort changed. new order: {ns}LastName DESC\n"
+    "2025-01-10 09:10:11.456 [User: U2] Result grid sort changed. new order: {ns}City ASC\n"
+    "2025-01-10 09:12:11.456 [User: U2] Some other action.\n"
+)
+
+SUFFIXES = {"ipc": (".arrow", pl.read_ipc), "parquet": (".parquet", pl.read_parquet)}
+
+@pytest.mark.parametrize("output_format", ["ipc", "parquet"])
+def test_sort_reports_in_binary_formats(tmp_path, output_format):
+    """Test that IPC and Parquet reports are written and hold the same data as the CSV reports."""
+    
+    input_dir = tmp_path / "logs" / "2025-01-09"
+    input_dir.mkdir(parents=True)
+    (input_dir / "U1.log").write_text(SORT_LOG)
+    (tmp_path / "csv").mkdir()
+    (tmp_path / output_format).mkdir()
+    
+    analyze_sort_usage(tmp_path / "logs", tmp_path / "csv")
+    analyze_sort_usage(tmp_path / "logs", tmp_path / output_format, output_format)
+    
+    suffix, read_report = SUFFIXES[output_format]
+    for file_name in EMPTY_SORT_REPORTS:
+        report_file = (tmp_path / output_format / file_name).with_suffix(suffix)
+        assert report_file.exists()
+        report = read_report(report_file)
+        expected = pl.read_csv(tmp_path / "csv" / file_name)
+        assert report.columns == expected.columns
+        # Empty reports are written with the same types, so runs can be concatenated
+        assert dict(report.schema) == EMPTY_SORT_REPORTS[file_name]
+        assert report.height == expected.height
+    
+    field_summary = read_report((tmp_path / output_format / "sort_field_summary.csv").with_suffix(suffix))
+    assert sorted(field_summary["sort_field"].cast(pl.String).to_list()) == ["City", "LastName"]
+
+def test_empty_sort_reports_csv(tmp_path):
+    """Test that empty CSV reports hold only their header line, ending in a bare newline."""
+    
+    create_empty_sort_reports(tmp_path)
+    
+    for file_name, columns in EMPTY_SORT_REPORTS.items():
+        assert (tmp_path / file_name).read_bytes() == (",".join(columns) + "\n").encode()
+
+@pytest.mark.parametrize("output_format", ["ipc", "parquet"])
+def test_empty_sort_reports_in_binary_formats(tmp_path, output_format):
+    """Test that empty IPC and Parquet reports are written with their column names and types."""
+    
+    create_empty_sort_reports(tmp_path, output_format)
+    
+    suffix, read_report = SUFFIXES[output_format]
+    for file_name, schema in EMPTY_SORT_REPORTS.items():
+        report = read_report((tmp_path / file_name).with_suffix(suffix))
+        assert dict(report.schema) == schema
+        assert report.height == 0